@@ -1,5 +1,5 @@
 """API service configuration."""
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
 
@@ -24,10 +24,11 @@ class APIConfig(BaseSettings):
     etl_time_window_minutes: int = int(os.getenv("ETL_TIME_WINDOW_MINUTES", "60"))
     etl_historical_baseline_days: int = int(os.getenv("ETL_HISTORICAL_BASELINE_DAYS", "30"))
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        extra = "ignore"  # Allow extra environment variables
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore"  # Allow extra environment variables
+    )
 
 
 # Global config instance
@@ -1,13 +1,14 @@
 """CV ingestion router for receiving CV events."""
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 import structlog
 from typing import List
 
 from api_service.deps import get_database
 from schemas.cv_event import CVEventCreate, CVEventResponse
 from db.models import Customer, CustomerBranchMovement, Branch
+from db.session import MOVEMENT_COLUMNS, bulk_insert_movements
 
 logger = structlog.get_logger()
 
@@ -39,17 +40,96 @@ async def ingest_cv_batch_events(
 ):
     """
     Ingest a batch of CV events.
+
+    Missing customers and branches are created up front, then all movement
+    rows are written with a single COPY. Both steps run in a savepoint; if one
+    fails, it is redone per event, each in its own savepoint, so one bad event
+    only drops itself. The response reports partial success as processed < total.
     """
-    results = []
+    if not events:
+        return {"status": "success", "processed": 0, "total": 0}
+
+    total = len(events)
+
+    try:
+        try:
+            async with db.begin_nested():
+                await ensure_customers_and_branches(events, db)
+        except Exception as e:
+            logger.warning("Customer/branch upsert for CV batch failed, retrying per event", error=str(e), total=total)
+            events = await ensure_customers_and_branches_individually(events, db)
+
+        rows = [
+            (event.customer_id, event.branch_id, event.enter_time, event.exit_time, event.action_type)
+            for event in events
+        ]
+        try:
+            async with db.begin_nested():
+                processed = await bulk_insert_movements(db, rows)
+        except Exception as e:
+            logger.warning("COPY of CV batch failed, inserting events one by one", error=str(e), total=len(rows))
+            processed = await insert_movements_individually(rows, db)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error ingesting CV batch", error=str(e), total=total)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ingest batch: {str(e)}"
+        )
+
+    logger.info("CV batch ingested", processed=processed)
+    return {"status": "success", "processed": processed, "total": total}
+
+
+async def ensure_customers_and_branches(events: List[CVEventCreate], db: AsyncSession):
+    """Create any customers and placeholder branches referenced by events, with one lookup each."""
+    customer_ids = {event.customer_id for event in events}
+    existing_customers = await db.execute(
+        select(Customer.customer_id).where(Customer.customer_id.in_(customer_ids))
+    )
+    for customer_id in customer_ids - set(existing_customers.scalars()):
+        db.add(Customer(customer_id=customer_id))
+        logger.info("New customer created", customer_id=str(customer_id))
+
+    branch_ids = {event.branch_id for event in events}
+    existing_branches = await db.execute(
+        select(Branch.id).where(Branch.id.in_(branch_ids))
+    )
+    for branch_id in branch_ids - set(existing_branches.scalars()):
+        logger.warning("Branch not found, creating placeholder", branch_id=branch_id)
+        db.add(Branch(id=branch_id, name=f"Branch {branch_id}", capacity=100))
+
+    # The COPY that follows bypasses the ORM, so referenced rows must be flushed first
+    await db.flush()
+
+
+async def ensure_customers_and_branches_individually(
+    events: List[CVEventCreate], db: AsyncSession
+) -> List[CVEventCreate]:
+    """Create referenced customers and branches one event per savepoint. Returns the events that succeeded."""
+    ready = []
     for event in events:
         try:
-            res = await process_single_event(event, db)
-            results.append(res)
+            async with db.begin_nested():
+                await ensure_customers_and_branches([event], db)
+            ready.append(event)
         except Exception as e:
             logger.error("Error in batch ingestion for single event", error=str(e))
-            continue
-    
-    return {"status": "success", "processed": len(results), "total": len(events)}
+    return ready
+
+
+async def insert_movements_individually(rows: List[tuple], db: AsyncSession) -> int:
+    """Insert movement rows one per savepoint, skipping the ones that fail. Returns rows inserted."""
+    processed = 0
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(CustomerBranchMovement).values(dict(zip(MOVEMENT_COLUMNS, row))))
+            processed += 1
+        except Exception as e:
+            logger.error("Error in batch ingestion for single event", error=str(e))
+    return processed
 
 
 async def process_single_event(event: CVEventCreate, db: AsyncSession):
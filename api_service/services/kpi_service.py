@@ -1,11 +1,104 @@
 """KPI computation service implementing all KPI formulas."""
+import math
 from typing import Dict, Any, Optional
 import numpy as np
 import structlog
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the formula kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 logger = structlog.get_logger()
 
 
+# KPI formulas, shared by the scalar compute_* methods, compute_all_kpis and
+# compute_all_kpis_batch. NaN stands in for None where a KPI is undefined.
+
+@njit(cache=True)
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator != 0 else np.nan
+
+
+@njit(cache=True)
+def _capped_ratio(numerator: float, denominator: float) -> float:
+    return min(numerator / denominator, 1.0) if denominator != 0 else np.nan
+
+
+@njit(cache=True)
+def _staffing_adequacy(staff_count: float, visitor_count: float, target_ratio: float) -> float:
+    return _ratio(staff_count, visitor_count * target_ratio)
+
+
+@njit(cache=True)
+def _bottleneck(congestion_level: float, staffing_adequacy: float) -> float:
+    if congestion_level != congestion_level:
+        return np.nan
+    # High congestion + low staffing = high bottleneck; missing (or zero) adequacy counts as 0.5
+    if staffing_adequacy != staffing_adequacy or staffing_adequacy == 0:
+        staffing_adequacy = 0.5
+    return min((congestion_level * 0.6) + ((1.0 - staffing_adequacy) * 0.4), 1.0)
+
+
+@njit(cache=True)
+def _compute_all_kernel(
+    total_visitors: float,
+    passed_count: float,
+    entered_count: float,
+    capacity: float,
+    staff_count: float,
+    historical_baseline: float
+):
+    congestion_level = _capped_ratio(entered_count, capacity)
+    staffing_adequacy = _staffing_adequacy(staff_count, total_visitors, 0.1)
+    return (
+        _ratio(total_visitors, historical_baseline),
+        _ratio(entered_count, entered_count + passed_count),
+        congestion_level,
+        _capped_ratio(entered_count, capacity),
+        staffing_adequacy,
+        _bottleneck(congestion_level, staffing_adequacy)
+    )
+
+
+@njit(cache=True)
+def _compute_all_rows(
+    total_visitors: np.ndarray,
+    passed_count: np.ndarray,
+    entered_count: np.ndarray,
+    capacity: np.ndarray,
+    staff_count: np.ndarray,
+    historical_baseline: np.ndarray,
+    out: np.ndarray
+) -> np.ndarray:
+    # One fused pass over the columns; out[k, i] is KPI k of branch i
+    for i in range(total_visitors.shape[0]):
+        kpis = _compute_all_kernel(
+            total_visitors[i], passed_count[i], entered_count[i],
+            capacity[i], staff_count[i], historical_baseline[i]
+        )
+        for k in range(6):
+            out[k, i] = kpis[k]
+    return out
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+# Field layout of the per-branch aggregates taken by compute_all_kpis_batch
+BRANCH_AGGREGATE_DTYPE = np.dtype([
+    ("total_visitors", np.float64),
+    ("passed_count", np.float64),
+    ("entered_count", np.float64),
+    ("capacity", np.float64),
+    ("staff_count", np.float64),
+])
+
+
 class KPIService:
     """Service for computing KPI metrics from aggregated data."""
     
@@ -25,9 +118,7 @@ class KPIService:
         Returns:
             Traffic index or None
         """
-        if historical_baseline == 0:
-            return None
-        return current_visitors / historical_baseline
+        return _none_if_nan(_ratio(float(current_visitors), float(historical_baseline)))
     
     @staticmethod
     def compute_conversion_proxy(
@@ -45,10 +136,7 @@ class KPIService:
         Returns:
             Conversion proxy or None
         """
-        total = entered_count + passed_count
-        if total == 0:
-            return None
-        return entered_count / total
+        return _none_if_nan(_ratio(float(entered_count), float(entered_count + passed_count)))
     
     @staticmethod
     def compute_congestion_level(
@@ -66,9 +154,7 @@ class KPIService:
         Returns:
             Congestion level or None
         """
-        if capacity == 0:
-            return None
-        return min(people_in_branch / capacity, 1.0)  # Cap at 1.0
+        return _none_if_nan(_capped_ratio(float(people_in_branch), float(capacity)))  # Cap at 1.0
     
     @staticmethod
     def compute_growth_momentum(
@@ -114,9 +200,7 @@ class KPIService:
         Returns:
             Utilization ratio or None
         """
-        if capacity == 0:
-            return None
-        return min(entered_count / capacity, 1.0)
+        return _none_if_nan(_capped_ratio(float(entered_count), float(capacity)))
     
     @staticmethod
     def compute_staffing_adequacy_index(
@@ -136,10 +220,7 @@ class KPIService:
         Returns:
             Staffing adequacy index or None
         """
-        required_staff = visitor_count * target_ratio
-        if required_staff == 0:
-            return None
-        return staff_count / required_staff
+        return _none_if_nan(_staffing_adequacy(float(staff_count), float(visitor_count), float(target_ratio)))
     
     @staticmethod
     def compute_bottleneck_score(
@@ -159,16 +240,13 @@ class KPIService:
         """
         if congestion_level is None:
             return None
-        
-        # High congestion + low staffing = high bottleneck
-        staffing_factor = 1.0 - (staffing_adequacy or 0.5)
-        bottleneck = (congestion_level * 0.6) + (staffing_factor * 0.4)
-        
-        return min(bottleneck, 1.0)
+        return _bottleneck(
+            float(congestion_level),
+            np.nan if staffing_adequacy is None else float(staffing_adequacy)
+        )
     
-    @classmethod
+    @staticmethod
     def compute_all_kpis(
-        cls,
         aggregated_data: Dict[str, Any],
         historical_baseline: float
     ) -> Dict[str, Optional[float]]:
@@ -182,31 +260,79 @@ class KPIService:
         Returns:
             Dictionary of all KPI metrics
         """
-        total_visitors = aggregated_data.get("total_visitors", 0)
-        passed_count = aggregated_data.get("passed_count", 0)
-        entered_count = aggregated_data.get("entered_count", 0)
-        capacity = aggregated_data.get("capacity", 100)
-        staff_count = aggregated_data.get("staff_count", 0)
-        
-        # Compute individual KPIs
-        traffic_index = cls.compute_traffic_index(total_visitors, historical_baseline)
-        conversion_proxy = cls.compute_conversion_proxy(entered_count, passed_count)
-        congestion_level = cls.compute_congestion_level(entered_count, capacity)
-        utilization_ratio = cls.compute_utilization_ratio(entered_count, capacity)
-        staffing_adequacy = cls.compute_staffing_adequacy_index(staff_count, total_visitors)
+        # All KPIs in one fused (optionally Numba-compiled) call
+        (
+            traffic_index,
+            conversion_proxy,
+            congestion_level,
+            utilization_ratio,
+            staffing_adequacy,
+            bottleneck_score
+        ) = _compute_all_kernel(
+            float(aggregated_data.get("total_visitors", 0)),
+            float(aggregated_data.get("passed_count", 0)),
+            float(aggregated_data.get("entered_count", 0)),
+            float(aggregated_data.get("capacity", 100)),
+            float(aggregated_data.get("staff_count", 0)),
+            float(historical_baseline)
+        )
         
         # Growth momentum requires historical data (simplified here)
         growth_momentum = None  # Would need time series data
         
-        # Bottleneck score
-        bottleneck_score = cls.compute_bottleneck_score(congestion_level, staffing_adequacy)
+        return {
+            "traffic_index": _none_if_nan(traffic_index),
+            "conversion_proxy": _none_if_nan(conversion_proxy),
+            "congestion_level": _none_if_nan(congestion_level),
+            "growth_momentum": growth_momentum,
+            "utilization_ratio": _none_if_nan(utilization_ratio),
+            "staffing_adequacy_index": _none_if_nan(staffing_adequacy),
+            "bottleneck_score": _none_if_nan(bottleneck_score)
+        }
+    
+    @staticmethod
+    def compute_all_kpis_batch(
+        data: np.ndarray,
+        historical_baseline: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compute all KPIs for many branches at once.
+        
+        Args:
+            data: Structured array with BRANCH_AGGREGATE_DTYPE fields, one row per branch
+            historical_baseline: Historical baseline per branch (or one for all)
+            
+        Returns:
+            Dictionary of KPI name to per-branch array, with NaN where
+            compute_all_kpis would return None
+        """
+        # All formulas in one fused (optionally Numba-compiled) pass over the columns
+        columns = [np.ascontiguousarray(data[name], dtype=np.float64) for name in BRANCH_AGGREGATE_DTYPE.names]
+        baseline = np.ascontiguousarray(
+            np.broadcast_to(np.asarray(historical_baseline, dtype=np.float64), len(data))
+        )
+        (
+            traffic_index,
+            conversion_proxy,
+            congestion_level,
+            utilization_ratio,
+            staffing_adequacy,
+            bottleneck_score
+        ) = _compute_all_rows(*columns, baseline, np.empty((6, len(data)), dtype=np.float64))
         
         return {
             "traffic_index": traffic_index,
             "conversion_proxy": conversion_proxy,
             "congestion_level": congestion_level,
-            "growth_momentum": growth_momentum,
+            "growth_momentum": np.full(len(data), np.nan),
             "utilization_ratio": utilization_ratio,
             "staffing_adequacy_index": staffing_adequacy,
             "bottleneck_score": bottleneck_score
         }
+    
+    @staticmethod
+    def warmup() -> None:
+        """Compile (or load cached) the KPI kernels so the first ETL window doesn't pay JIT cost."""
+        _compute_all_kernel(1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+        ones = np.ones(1, dtype=np.float64)
+        _compute_all_rows(ones, ones, ones, ones, ones, ones, np.empty((6, 1), dtype=np.float64))
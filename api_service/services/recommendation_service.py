@@ -1,3 +1,4 @@
+from dataclasses import replace
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
@@ -74,7 +75,7 @@ class RecommendationService:
             # 3. Generate Explanation
             branch_name = kpi_record.branch.name if kpi_record.branch else branch_id
             explanation = self.explainer.generate(branch_name, situation_result, kpis, recommendations)
-            situation_result.details = explanation
+            situation_result = replace(situation_result, details=explanation)
             
             logger.info(f"Generated {len(recommendations)} recommendations for branch {branch_id}")
             
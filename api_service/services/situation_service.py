@@ -1,3 +1,4 @@
+from dataclasses import replace
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
@@ -66,7 +67,7 @@ class SituationService:
             # Generate Explanation
             branch_name = kpi_record.branch.name if kpi_record.branch else branch_id
             explanation = self.explainer.generate(branch_name, situation, kpis)
-            situation.details = explanation
+            situation = replace(situation, details=explanation)
             
             logger.info(f"Situation analyzed for branch {branch_id}: {situation.situation_label}")
             return situation
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pathlib import Path
 import yaml
 from typing import Dict, Any
@@ -5,6 +6,38 @@ import structlog
 
 logger = structlog.get_logger()
 
+
+@dataclass(slots=True, frozen=True)
+class SituationThresholds:
+    """Situation thresholds flattened into attributes; defaults apply to keys missing from config."""
+    crowding_congestion: float = 0.8
+    crowding_high: float = 0.9
+    crowding_medium: float = 0.8
+    understaffed_adequacy: float = 0.7
+    understaffed_bottleneck: float = 0.6
+    htlc_traffic: float = 1.2
+    htlc_conversion: float = 0.6
+    underperformance_traffic: float = 0.7
+
+    @classmethod
+    def from_config(cls, thresholds: Dict[str, Any]) -> "SituationThresholds":
+        crowding = thresholds.get("crowding", {})
+        understaffed = thresholds.get("understaffed", {})
+        htlc = thresholds.get("high_traffic_low_conversion", {})
+        underperformance = thresholds.get("underperformance", {})
+        defaults = cls()
+        return cls(
+            crowding_congestion=crowding.get("congestion_level", defaults.crowding_congestion),
+            crowding_high=crowding.get("severity_high", defaults.crowding_high),
+            crowding_medium=crowding.get("severity_medium", defaults.crowding_medium),
+            understaffed_adequacy=understaffed.get("staffing_adequacy_index", defaults.understaffed_adequacy),
+            understaffed_bottleneck=understaffed.get("bottleneck_score", defaults.understaffed_bottleneck),
+            htlc_traffic=htlc.get("traffic_index", defaults.htlc_traffic),
+            htlc_conversion=htlc.get("conversion_proxy", defaults.htlc_conversion),
+            underperformance_traffic=underperformance.get("traffic_index", defaults.underperformance_traffic),
+        )
+
+
 class BusinessRulesConfig:
     _instance = None
     _config: Dict[str, Any] = {}
@@ -34,10 +67,22 @@ class BusinessRulesConfig:
             logger.error(f"Failed to load business rules config: {e}")
             self._config = {}
 
+        self._compiled_thresholds = SituationThresholds.from_config(self.situation_thresholds)
+
+        # Normalize priorities once so sorting never has to case-fold
+        for rules in self.recommendation_rules.values():
+            for rule in rules:
+                if isinstance(rule.get("priority"), str):
+                    rule["priority"] = rule["priority"].lower()
+
     @property
     def situation_thresholds(self) -> Dict[str, Any]:
         return self._config.get("situation_thresholds", {})
         
+    @property
+    def compiled_thresholds(self) -> SituationThresholds:
+        return self._compiled_thresholds
+
     @property
     def recommendation_rules(self) -> Dict[str, Any]:
         return self._config.get("recommendations", {})
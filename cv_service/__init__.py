@@ -0,0 +1,11 @@
+"""CV service package."""
+import structlog
+
+# Configure structured logging once for every CV service entry point
+structlog.configure(
+    processors=[
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.add_log_level,
+        structlog.processors.JSONRenderer()
+    ]
+)
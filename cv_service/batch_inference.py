@@ -0,0 +1,128 @@
+"""Cross-stream batched YOLO inference with per-stream tracking."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+import structlog
+import torch
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+
+from cv_service.detector import PersonDetector
+
+logger = structlog.get_logger()
+
+
+class BatchedDetector:
+    """Runs frames queued by several stream processors through one detector as a batch."""
+
+    def __init__(self, detector: PersonDetector, batch_max: int = 16, batch_window_ms: float = 5.0):
+        """
+        Initialize batched detector and start its worker thread.
+
+        Args:
+            detector: Shared person detector
+            batch_max: Maximum frames per forward pass
+            batch_window_ms: How long to wait for more frames after the first arrives
+        """
+        self.detector = detector
+        self.batch_max = batch_max
+        self.batch_window = batch_window_ms / 1000.0
+
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._worker_thread = threading.Thread(
+            target=self._worker_loop,
+            name="BatchedDetector-Worker",
+            daemon=True
+        )
+        self._worker_thread.start()
+
+        logger.info("Batched detector started", batch_max=batch_max, batch_window_ms=batch_window_ms)
+
+    def infer(self, frame: np.ndarray):
+        """Queue a frame and block until its detection result is ready."""
+        future: Future = Future()
+        self._queue.put((frame, future))
+        return future.result()
+
+    def _worker_loop(self):
+        """Collect up to batch_max frames within the window and detect them in one pass."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+
+            while len(batch) < self.batch_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.detector.detect_batch([frame for frame, _ in batch])
+            except Exception as e:
+                logger.error("Batched inference failed", error=str(e), count=len(batch))
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class StreamTracker:
+    """ByteTrack state for one stream, fed with detections from a shared batch."""
+
+    def __init__(self, tracker_config: str = "bytetrack.yaml", frame_rate: int = 30):
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+        self._tracker = BYTETracker(args=cfg, frame_rate=frame_rate)
+
+    def update(self, result, frame: np.ndarray) -> List:
+        """
+        Assign track IDs to a detection result, mirroring Ultralytics' track().
+
+        Args:
+            result: Ultralytics detection result for this stream's frame
+            frame: The frame the result was computed on
+
+        Returns:
+            Single-element results list, as returned by PersonDetector.track
+        """
+        det = result.boxes.cpu().numpy()
+        if len(det) == 0:
+            return [result]
+
+        tracks = self._tracker.update(det, frame)
+        if len(tracks) == 0:
+            return [result]
+
+        result = result[tracks[:, -1].astype(int)]
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return [result]
+
+
+@lru_cache(maxsize=None)
+def get_batched_detector(
+    model_path: str,
+    confidence_threshold: float,
+    use_tensorrt: bool,
+    imgsz: int,
+    batch_max: int,
+    batch_window_ms: float
+) -> BatchedDetector:
+    """Process-wide batched detector shared by all streams using the same model."""
+    detector = PersonDetector(
+        model_path=model_path,
+        confidence_threshold=confidence_threshold,
+        use_tensorrt=use_tensorrt,
+        imgsz=imgsz,
+        batch=batch_max
+    )
+    return BatchedDetector(detector, batch_max=batch_max, batch_window_ms=batch_window_ms)
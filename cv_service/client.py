@@ -3,14 +3,18 @@ import asyncio
 import queue
 import threading
 import time
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
 import httpx
+import orjson
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = structlog.get_logger()
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class CVAPIClient:
     """Client for posting CV events to backend API with an internal async queue."""
@@ -120,7 +124,9 @@ class CVAPIClient:
     async def post_event(self, event_data: Dict[str, Any]) -> bool:
         try:
             async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self.events_endpoint, json=event_data)
+                response = await client.post(
+                    self.events_endpoint, content=orjson.dumps(event_data), headers=JSON_HEADERS
+                )
 
             if self._is_success(response.status_code):
                 return True
@@ -156,7 +162,9 @@ class CVAPIClient:
 
         try:
             async with httpx.AsyncClient(timeout=15.0) as client:
-                resp1 = await client.post(self.events_batch_endpoint, json=events)
+                resp1 = await client.post(
+                    self.events_batch_endpoint, content=orjson.dumps(events), headers=JSON_HEADERS
+                )
 
                 # ✅ backend doesn't support batch -> disable it forever
                 if resp1.status_code == 404:
@@ -203,3 +211,9 @@ class CVAPIClient:
         except RuntimeError:
             loop = asyncio.new_event_loop()
             return loop.run_until_complete(self.post_events_batch(events))
+
+
+@lru_cache(maxsize=4)
+def get_shared_client(api_base_url: str) -> CVAPIClient:
+    """Process-wide client, so all streams posting to one API share a queue and worker."""
+    return CVAPIClient(api_base_url)
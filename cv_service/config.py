@@ -1,5 +1,5 @@
 """Configuration management for CV service."""
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Tuple
 import os
 from dotenv import load_dotenv
@@ -28,6 +28,26 @@ class CVConfig(BaseSettings):
     # YOLO model configuration
     yolo_model_path: str = os.getenv("YOLO_MODEL_PATH", "yolov8n.pt")
     yolo_confidence_threshold: float = float(os.getenv("YOLO_CONFIDENCE_THRESHOLD", "0.5"))
+    # Longest side frames are downscaled to before inference (0 disables)
+    inference_size: int = int(os.getenv("CV_INFERENCE_SIZE", "640"))
+    # Run YOLO through an FP16 TensorRT engine (built next to the weights on first use)
+    use_tensorrt: bool = os.getenv("CV_USE_TENSORRT", "false").lower() == "true"
+    # Per-stream detector: ultralytics, trt (same as CV_USE_TENSORRT) or opencv_dnn (ONNX on cv2.dnn)
+    detector_backend: str = os.getenv("CV_DETECTOR_BACKEND", "ultralytics").lower()
+    # Share one detector across streams and batch their frames per forward pass
+    batch_inference: bool = os.getenv("CV_BATCH_INFERENCE", "false").lower() == "true"
+    inference_batch_max: int = int(os.getenv("CV_INFERENCE_BATCH_MAX", "16"))
+    inference_batch_window_ms: float = float(os.getenv("CV_INFERENCE_BATCH_WINDOW_MS", "5"))
+    # Decode with NVDEC (cv2.cudacodec) and keep frames on the GPU; needs a CUDA OpenCV build
+    gpu_decode: bool = os.getenv("CV_GPU_DECODE", "false").lower() == "true"
+    # Resize/letterbox host frames on the GPU instead of in Ultralytics' CPU preprocessing
+    gpu_preprocess: bool = os.getenv("CV_GPU_PREPROCESS", "false").lower() == "true"
+    # Upload host frames through pinned buffers on a side CUDA stream (implies GPU preprocessing)
+    pinned_upload: bool = os.getenv("CV_PINNED_UPLOAD", "false").lower() == "true"
+    # Skip inference on near-static frames (mean abs gray diff below threshold),
+    # at most frame_skip_max frames in a row (0 disables)
+    motion_threshold: float = float(os.getenv("CV_MOTION_THRESHOLD", "2.0"))
+    frame_skip_max: int = int(os.getenv("CV_FRAME_SKIP_MAX", "0"))
     
     # Tracker configuration
     tracker_type: str = os.getenv("TRACKER_TYPE", "bytetrack")
@@ -45,6 +65,9 @@ class CVConfig(BaseSettings):
 
     # Stream reconnect behavior
     reconnect_delay_seconds: int = int(os.getenv("CV_RECONNECT_DELAY_SECONDS", "5"))
+    stream_timeout_seconds: int = int(os.getenv("CV_STREAM_TIMEOUT_SECONDS", "5"))
+    read_retry_attempts: int = int(os.getenv("CV_READ_RETRY_ATTEMPTS", "5"))
+    freeze_reconnect_seconds: int = int(os.getenv("CV_FREEZE_RECONNECT_SECONDS", "10"))
     heartbeat_interval_seconds: int = int(os.getenv("CV_HEARTBEAT_INTERVAL_SECONDS", "30"))
 
     # Event batching
@@ -62,10 +85,11 @@ class CVConfig(BaseSettings):
             raise ValueError("ROI coordinates must be in format: x1,y1,x2,y2")
         return tuple(coords)
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        extra = "ignore"  # Allow extra environment variables
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore"  # Allow extra environment variables
+    )
 
 
 # Global config instance
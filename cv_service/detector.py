@@ -1,10 +1,16 @@
 """YOLOv8 person detection and tracking module."""
 from ultralytics import YOLO
+import cv2
 import numpy as np
+import torch
 from typing import List, Tuple
 import structlog
 import os
 
+from cv_service.gpu_decode import gpumat_to_tensor
+from cv_service.gpu_transfer import letterbox
+from cv_service.trt_export import export_tensorrt_engine
+
 # Disable PyTorch 2.6 weights_only restriction for Ultralytics models
 os.environ['TORCH_FORCE_WEIGHTS_ONLY_LOAD'] = '0'
 
@@ -17,19 +23,32 @@ class PersonDetector:
     # COCO dataset person class ID
     PERSON_CLASS_ID = 0
     
-    def __init__(self, model_path: str = "yolov8n.pt", confidence_threshold: float = 0.5):
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        confidence_threshold: float = 0.5,
+        use_tensorrt: bool = False,
+        imgsz: int = 640,
+        batch: int = 1
+    ):
         """
         Initialize YOLOv8 detector.
         
         Args:
             model_path: Path to YOLO model weights
             confidence_threshold: Minimum confidence for detections
+            use_tensorrt: Run inference through an FP16 TensorRT engine
+            imgsz: Input size the TensorRT engine is built for
+            batch: Maximum batch size the TensorRT engine is built for
         """
+        if use_tensorrt:
+            model_path = export_tensorrt_engine(model_path, imgsz=imgsz, batch=batch)
+
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         
         logger.info("Loading YOLO model", model_path=model_path)
-        self.model = YOLO(model_path)
+        self.model = YOLO(model_path, task="detect")
         logger.info("YOLO model loaded successfully")
     
     def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
@@ -92,6 +111,52 @@ class PersonDetector:
             tracker="bytetrack.yaml"
         )
     
+    def track_gpumat(self, gpu_frame: "cv2.cuda.GpuMat", ratio: float):
+        """
+        Track persons in a GPU-decoded frame without copying it to the host.
+
+        Args:
+            gpu_frame: BGRA frame from the NVDEC reader
+            ratio: Resize factor applied before letterbox padding
+
+        Returns:
+            Ultralytics tracking results, in resized-frame coordinates.
+        """
+        width, height = gpu_frame.size()
+        size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+        if size != (width, height):
+            # Resize while still uint8; letterbox() then only pads
+            gpu_frame = cv2.cuda.resize(gpu_frame, size, interpolation=cv2.INTER_LINEAR)
+        rgb = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2RGB)
+        tensor = gpumat_to_tensor(rgb).permute(2, 0, 1).unsqueeze(0).float().div_(255.0)
+        return self.track(letterbox(tensor, 1.0))
+
+    def track_tensor(self, frame: torch.Tensor, ratio: float):
+        """
+        Track persons in a frame already uploaded to the GPU, preprocessing on device.
+
+        Args:
+            frame: HWC uint8 BGR frame on the device
+            ratio: Resize factor applied before letterbox padding
+
+        Returns:
+            Ultralytics tracking results, in resized-frame coordinates.
+        """
+        chw = frame.permute(2, 0, 1).flip(0).unsqueeze(0).float().div_(255.0)
+        return self.track(letterbox(chw, ratio))
+
+    def detect_batch(self, frames: List[np.ndarray]):
+        """
+        Run detection (no tracking) on several frames in one forward pass.
+
+        Args:
+            frames: Input image frames (BGR format), one per stream
+
+        Returns:
+            Ultralytics results, one per frame.
+        """
+        return self.model.predict(frames, verbose=False)
+    
     def get_center(self, bbox: Tuple[int, int, int, int]) -> Tuple[int, int]:
         """
         Get center point of bounding box.
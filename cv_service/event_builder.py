@@ -1,9 +1,12 @@
 """CV event builder for constructing event payloads."""
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 import uuid
 from schemas.cv_event import ActionType
 
+# (customer_id, track_id, action_type, roi_id, enter_time, exit_time, frame_time, confidence_avg)
+EventRow = Tuple[uuid.UUID, int, ActionType, str, datetime, Optional[datetime], datetime, Optional[float]]
+
 
 class CVEventBuilder:
     """Builds CV event payloads matching the exact contract."""
@@ -54,3 +57,33 @@ class CVEventBuilder:
             "confidence_avg": confidence_avg,
             "frame_time": frame_time.isoformat()
         }
+
+    @staticmethod
+    def build_events(rows: Iterable[EventRow], branch_id: str, camera_id: str) -> List[dict]:
+        """
+        Build CV event payloads for buffered event rows in one pass.
+
+        Args:
+            rows: Event rows as laid out by EventRow
+            branch_id: Branch identifier shared by all rows
+            camera_id: Camera identifier shared by all rows
+
+        Returns:
+            Event payload dictionaries, same shape as build_event()
+        """
+        return [
+            {
+                "customer_id": str(customer_id),
+                "branch_id": branch_id,
+                "enter_time": enter_time.isoformat(),
+                "exit_time": exit_time.isoformat() if exit_time else None,
+                "action_type": action_type.value,
+                "camera_id": camera_id,
+                "roi_id": roi_id,
+                "track_id": track_id,
+                "dwell_time_seconds": (exit_time - enter_time).total_seconds() if exit_time else None,
+                "confidence_avg": confidence_avg,
+                "frame_time": frame_time.isoformat()
+            }
+            for customer_id, track_id, action_type, roi_id, enter_time, exit_time, frame_time, confidence_avg in rows
+        ]
@@ -0,0 +1,48 @@
+"""NVDEC video decoding through cv2.cudacodec, for OpenCV builds with CUDA."""
+from typing import Optional, Tuple
+
+import cv2
+import structlog
+import torch
+
+logger = structlog.get_logger()
+
+
+class CudaVideoReader:
+    """cv2.VideoCapture-like wrapper whose frames stay on the GPU as BGRA GpuMats."""
+
+    def __init__(self, source: str):
+        self._reader = cv2.cudacodec.createVideoReader(source)
+
+    def isOpened(self) -> bool:
+        return self._reader is not None
+
+    def read(self) -> Tuple[bool, Optional["cv2.cuda.GpuMat"]]:
+        ok, gpu_frame = self._reader.nextFrame()
+        return ok, gpu_frame if ok else None
+
+    def release(self) -> None:
+        self._reader = None
+
+
+def open_cuda_reader(source: str) -> Optional[CudaVideoReader]:
+    """
+    Open a hardware-decoding reader for a source.
+
+    Returns:
+        The reader, or None when OpenCV lacks cudacodec or NVDEC can't open the source
+    """
+    if not hasattr(cv2, "cudacodec"):
+        return None
+    try:
+        return CudaVideoReader(source)
+    except cv2.error as exc:
+        logger.warning("GPU decode unavailable, falling back to CPU", source=source, error=str(exc))
+        return None
+
+
+def gpumat_to_tensor(gpu_mat: "cv2.cuda.GpuMat") -> torch.Tensor:
+    """View an HWC GpuMat as a CUDA uint8 tensor, downloading only if OpenCV can't share it."""
+    if hasattr(gpu_mat, "__cuda_array_interface__"):
+        return torch.as_tensor(gpu_mat, device="cuda")
+    return torch.from_numpy(gpu_mat.download()).cuda()
@@ -0,0 +1,72 @@
+"""Host -> device frame uploads and on-GPU YOLO preprocessing."""
+from typing import List, Optional
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# Ultralytics' letterbox fill (114 grey), in normalized units
+LETTERBOX_FILL = 114 / 255.0
+
+
+def letterbox(image: torch.Tensor, ratio: float, stride: int = 32) -> torch.Tensor:
+    """
+    Resize a BCHW float image by ratio and pad bottom/right to a stride multiple.
+
+    Padding only at the bottom/right keeps box coordinates in resized-image
+    space, so mapping back to the frame is a single division by ratio.
+    """
+    height, width = image.shape[-2:]
+    new_height, new_width = max(1, round(height * ratio)), max(1, round(width * ratio))
+    if (new_height, new_width) != (height, width):
+        image = F.interpolate(image, size=(new_height, new_width), mode="bilinear", align_corners=False)
+
+    pad_h, pad_w = -new_height % stride, -new_width % stride
+    if pad_h or pad_w:
+        image = F.pad(image, (0, pad_w, 0, pad_h), value=LETTERBOX_FILL)
+    return image.contiguous()
+
+
+def upload_frame(frame: np.ndarray, device: str = "cuda") -> torch.Tensor:
+    """Plain (pageable) upload of an HWC uint8 frame."""
+    return torch.from_numpy(frame).to(device)
+
+
+class PinnedFrameUploader:
+    """Double-buffered pinned staging so frame uploads are true async DMA copies."""
+
+    def __init__(self, device: str = "cuda"):
+        self.device = device
+        self._pinned: List[Optional[torch.Tensor]] = [None, None]
+        self._copied = [torch.cuda.Event(), torch.cuda.Event()]
+        self._stream = torch.cuda.Stream()
+        self._index = 0
+
+    def upload(self, frame: np.ndarray) -> torch.Tensor:
+        """
+        Copy a frame into the next pinned buffer and upload it asynchronously.
+
+        Args:
+            frame: HWC uint8 frame from the decoder
+
+        Returns:
+            The frame on the device, ordered before later work on the current stream
+        """
+        self._index ^= 1
+        buf = self._pinned[self._index]
+        if buf is None or tuple(buf.shape) != frame.shape:
+            buf = torch.empty(frame.shape, dtype=torch.uint8, pin_memory=True)
+            self._pinned[self._index] = buf
+        else:
+            # The upload issued from this buffer two frames ago must finish before reuse
+            self._copied[self._index].synchronize()
+
+        buf.numpy()[...] = frame
+        with torch.cuda.stream(self._stream):
+            gpu_frame = buf.to(self.device, non_blocking=True)
+            self._copied[self._index].record(self._stream)
+
+        current = torch.cuda.current_stream()
+        current.wait_stream(self._stream)
+        gpu_frame.record_stream(current)
+        return gpu_frame
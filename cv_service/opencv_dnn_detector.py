@@ -0,0 +1,124 @@
+"""YOLOv8 person detection through OpenCV's DNN module (CUDA FP16 when available)."""
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+import structlog
+import torch
+from ultralytics import YOLO
+from ultralytics.engine.results import Results
+
+from cv_service.batch_inference import StreamTracker
+
+logger = structlog.get_logger()
+
+
+def ensure_onnx_model(model_path: str, imgsz: int = 640) -> str:
+    """Export YOLO weights to ONNX next to the weights, reusing an existing export."""
+    weights = Path(model_path)
+    if weights.suffix == ".onnx":
+        return model_path
+
+    onnx_path = weights.with_suffix(".onnx")
+    if not onnx_path.exists():
+        logger.info("Exporting ONNX model", model_path=model_path, imgsz=imgsz)
+        exported = Path(YOLO(model_path).export(format="onnx", imgsz=imgsz))
+        if exported != onnx_path:
+            exported.replace(onnx_path)
+    return str(onnx_path)
+
+
+class OpenCVDNNDetector:
+    """PersonDetector-compatible detector running an ONNX YOLOv8 model on cv2.dnn."""
+
+    # COCO dataset person class ID
+    PERSON_CLASS_ID = 0
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        confidence_threshold: float = 0.5,
+        imgsz: int = 640,
+        nms_threshold: float = 0.45
+    ):
+        """
+        Initialize OpenCV DNN detector.
+
+        Args:
+            model_path: Path to an ONNX model, or YOLO weights to export one from
+            confidence_threshold: Minimum confidence for detections
+            imgsz: Square network input size the model was exported for
+            nms_threshold: IoU threshold for non-maximum suppression
+        """
+        self.model_path = ensure_onnx_model(model_path, imgsz=imgsz)
+        self.confidence_threshold = confidence_threshold
+        self.imgsz = imgsz
+        self.nms_threshold = nms_threshold
+
+        logger.info("Loading ONNX model", model_path=self.model_path)
+        self.net = cv2.dnn.readNetFromONNX(self.model_path)
+        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+        else:
+            logger.warning("OpenCV built without CUDA; running DNN detector on CPU")
+
+        self._tracker = StreamTracker()
+        logger.info("ONNX model loaded successfully")
+
+    def _forward(self, frame: np.ndarray) -> np.ndarray:
+        """Run the network and return NMS-filtered person boxes as (N, 5) [x1, y1, x2, y2, conf]."""
+        height, width = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, (self.imgsz, self.imgsz), swapRB=True, crop=False)
+        self.net.setInput(blob)
+        # YOLOv8 output is (1, 4 + classes, anchors): cx, cy, w, h then per-class scores
+        output = self.net.forward()[0]
+
+        scores = output[4 + self.PERSON_CLASS_ID]
+        keep = scores >= self.confidence_threshold
+        if not keep.any():
+            return np.zeros((0, 5), dtype=np.float32)
+
+        cx, cy, w, h = output[:4, keep]
+        scores = scores[keep]
+        sx, sy = width / self.imgsz, height / self.imgsz
+        xywh = np.stack([(cx - w / 2) * sx, (cy - h / 2) * sy, w * sx, h * sy], axis=1)
+
+        indices = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), self.confidence_threshold, self.nms_threshold)
+        indices = np.asarray(indices, dtype=np.intp).reshape(-1)
+        x1, y1, bw, bh = xywh[indices].T
+        return np.stack([x1, y1, x1 + bw, y1 + bh, scores[indices]], axis=1).astype(np.float32)
+
+    def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
+        """
+        Detect persons in a frame.
+
+        Args:
+            frame: Input image frame (BGR format)
+
+        Returns:
+            List of detections as (x1, y1, x2, y2, confidence)
+        """
+        return [
+            (int(x1), int(y1), int(x2), int(y2), float(conf))
+            for x1, y1, x2, y2, conf in self._forward(frame).tolist()
+        ]
+
+    def predict(self, frame: np.ndarray) -> Results:
+        """Detect persons and wrap them as an Ultralytics result (class column is all persons)."""
+        boxes = self._forward(frame)
+        data = np.concatenate([boxes, np.full((len(boxes), 1), self.PERSON_CLASS_ID, dtype=np.float32)], axis=1)
+        return Results(orig_img=frame, path="", names={self.PERSON_CLASS_ID: "person"}, boxes=torch.from_numpy(data))
+
+    def track(self, frame: np.ndarray):
+        """
+        Track persons in a frame using ByteTrack.
+
+        Args:
+            frame: Input image frame (BGR format)
+
+        Returns:
+            Single-element results list, as returned by PersonDetector.track
+        """
+        return self._tracker.update(self.predict(frame), frame)
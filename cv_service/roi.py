@@ -5,7 +5,10 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, Iterable, List, Optional, Tuple
 
-from shapely.geometry import LineString, Point, Polygon
+import numpy as np
+from shapely.geometry import LineString, Polygon
+
+from cv_service.roi_kernels import line_cross_batch, poly_inside_batch, polygon_edges
 
 
 PointTuple = Tuple[float, float]
@@ -42,15 +45,46 @@ class ROIBase:
         """Check if a line is crossed between two points."""
         return False
 
+    def is_inside_batch(self, points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Check which of an (N, 2) array of points are inside the ROI."""
+        if out is None:
+            return np.zeros(len(points), dtype=bool)
+        out[:] = False
+        return out
+
+    def crossed_batch(
+        self,
+        prev_points: np.ndarray,
+        curr_points: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Check which (N, 2) prev -> curr movements cross the ROI."""
+        if out is None:
+            return np.zeros(len(curr_points), dtype=bool)
+        out[:] = False
+        return out
+
 
 @dataclass
 class PolygonROI(ROIBase):
     """Polygon ROI with Shapely."""
     points: List[PointTuple] = field(default_factory=list)
     _polygon: Polygon = field(init=False)
+    _edges: np.ndarray = field(init=False, repr=False)
+    _bbox: Tuple[float, float, float, float] = field(init=False, repr=False)
+    _edge_list: List[Tuple[float, float, float, float]] = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self._polygon = Polygon(self.points)
+        vertices = np.asarray(self.points, dtype=np.float64).reshape(-1, 2)
+        self._edges = polygon_edges(vertices)
+        # Flat (x1, y1, x2, y2) edges for the scalar check, built once
+        self._edge_list = [tuple(edge) for edge in self._edges.reshape(-1, 4).tolist()]
+        if len(vertices):
+            (minx, miny), (maxx, maxy) = vertices.min(axis=0), vertices.max(axis=0)
+            self._bbox = (float(minx), float(miny), float(maxx), float(maxy))
+        else:
+            self._bbox = (np.inf, np.inf, -np.inf, -np.inf)
 
     def validate(self) -> None:
         if len(self.points) < 3:
@@ -59,7 +93,34 @@ class PolygonROI(ROIBase):
             raise ROIConfigError("Polygon ROI is not a valid polygon.")
 
     def is_inside(self, point: PointTuple) -> bool:
-        return Point(point).within(self._polygon)
+        minx, miny, maxx, maxy = self._bbox
+        x, y = point
+        if x < minx or x > maxx or y < miny or y > maxy:
+            return False
+
+        # Same ray cast as the batch kernel, over precomputed edges
+        inside = False
+        for x1, y1, x2, y2 in self._edge_list:
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+    def is_inside_batch(self, points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        # Bounding-box reject first; only candidates go through the polygon kernel
+        minx, miny, maxx, maxy = self._bbox
+        px, py = points[:, 0], points[:, 1]
+        candidates = np.logical_and.reduce((px >= minx, px <= maxx, py >= miny, py <= maxy))
+        if candidates.all():
+            return poly_inside_batch(points, self._edges, out)
+
+        if out is None:
+            out = np.zeros(len(points), dtype=bool)
+        else:
+            out[:] = False
+        idx = np.flatnonzero(candidates)
+        if len(idx):
+            out[idx] = poly_inside_batch(points[idx], self._edges)
+        return out
 
 
 @dataclass
@@ -67,9 +128,17 @@ class LineROI(ROIBase):
     """Line ROI for crossing detection."""
     points: List[PointTuple] = field(default_factory=list)
     _line: LineString = field(init=False)
+    _vertices: np.ndarray = field(init=False, repr=False)
+    _x1: float = field(init=False, repr=False)
+    _y1: float = field(init=False, repr=False)
+    _x2: float = field(init=False, repr=False)
+    _y2: float = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self._line = LineString(self.points)
+        self._vertices = np.asarray(self.points, dtype=np.float64).reshape(-1, 2)
+        if len(self._vertices) == 2:
+            (self._x1, self._y1), (self._x2, self._y2) = self._vertices.tolist()
 
     def validate(self) -> None:
         if len(self.points) != 2:
@@ -81,8 +150,23 @@ class LineROI(ROIBase):
     def crossed(self, prev_point: Optional[PointTuple], curr_point: PointTuple) -> bool:
         if prev_point is None:
             return False
-        segment = LineString([prev_point, curr_point])
-        return segment.crosses(self._line)
+
+        # Proper crossing: each segment's endpoints lie strictly on opposite sides of the other
+        ax, ay, bx, by = self._x1, self._y1, self._x2, self._y2
+        (px, py), (qx, qy) = prev_point, curr_point
+        d1 = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        d2 = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+        d3 = (qx - px) * (ay - py) - (qy - py) * (ax - px)
+        d4 = (qx - px) * (by - py) - (qy - py) * (bx - px)
+        return d1 * d2 < 0 and d3 * d4 < 0
+
+    def crossed_batch(
+        self,
+        prev_points: np.ndarray,
+        curr_points: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return line_cross_batch(prev_points, curr_points, self._vertices, out)
 
 
 def build_rois(roi_configs: Iterable[Dict]) -> List[ROIBase]:
@@ -0,0 +1,131 @@
+"""Batch ROI geometry kernels, compiled with Numba when it is installed."""
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; the NumPy kernels are used instead
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+def polygon_edges(vertices: np.ndarray) -> np.ndarray:
+    """Build the (M, 2, 2) closed edge array [start, end] for (M, 2) polygon vertices."""
+    return np.ascontiguousarray(np.stack([vertices, np.roll(vertices, -1, axis=0)], axis=1))
+
+
+@njit(cache=True, parallel=True)
+def _line_cross_jit(prev_xy: np.ndarray, curr_xy: np.ndarray, line_xy: np.ndarray, out: np.ndarray) -> np.ndarray:
+    n = prev_xy.shape[0]
+    ax, ay = line_xy[0, 0], line_xy[0, 1]
+    bx, by = line_xy[1, 0], line_xy[1, 1]
+    for i in prange(n):
+        px, py = prev_xy[i, 0], prev_xy[i, 1]
+        qx, qy = curr_xy[i, 0], curr_xy[i, 1]
+        # Sign of the cross product tells which side of a segment a point lies on
+        d1 = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        d2 = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+        d3 = (qx - px) * (ay - py) - (qy - py) * (ax - px)
+        d4 = (qx - px) * (by - py) - (qy - py) * (bx - px)
+        out[i] = d1 * d2 < 0 and d3 * d4 < 0
+    return out
+
+
+def _line_cross_np(prev_xy: np.ndarray, curr_xy: np.ndarray, line_xy: np.ndarray, out: np.ndarray) -> np.ndarray:
+    (ax, ay), (bx, by) = line_xy
+    px, py = prev_xy[:, 0], prev_xy[:, 1]
+    qx, qy = curr_xy[:, 0], curr_xy[:, 1]
+    d1 = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+    d2 = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+    d3 = (qx - px) * (ay - py) - (qy - py) * (ax - px)
+    d4 = (qx - px) * (by - py) - (qy - py) * (bx - px)
+    return np.logical_and(d1 * d2 < 0, d3 * d4 < 0, out=out)
+
+
+@njit(cache=True, parallel=True)
+def _poly_inside_jit(xy: np.ndarray, edges: np.ndarray, out: np.ndarray) -> np.ndarray:
+    n = xy.shape[0]
+    m = edges.shape[0]
+    for i in prange(n):
+        px, py = xy[i, 0], xy[i, 1]
+        inside = False
+        for k in range(m):
+            x1, y1 = edges[k, 0, 0], edges[k, 0, 1]
+            x2, y2 = edges[k, 1, 0], edges[k, 1, 1]
+            if (y1 > py) != (y2 > py):
+                if px < (x2 - x1) * (py - y1) / (y2 - y1) + x1:
+                    inside = not inside
+        out[i] = inside
+    return out
+
+
+def _poly_inside_np(xy: np.ndarray, edges: np.ndarray, out: np.ndarray) -> np.ndarray:
+    # Winding number: signed count of edges crossing the rightward ray, broadcast over (N, M)
+    px, py = xy[:, 0, None], xy[:, 1, None]
+    x1, y1 = edges[:, 0, 0], edges[:, 0, 1]
+    x2, y2 = edges[:, 1, 0], edges[:, 1, 1]
+    cross = (x2 - x1) * (py - y1) - (px - x1) * (y2 - y1)
+    upward = (y1 <= py) & (y2 > py) & (cross > 0)
+    downward = (y1 > py) & (y2 <= py) & (cross < 0)
+    return np.not_equal(upward.sum(axis=1), downward.sum(axis=1), out=out)
+
+
+if NUMBA_AVAILABLE:
+    _line_cross, _poly_inside = _line_cross_jit, _poly_inside_jit
+else:
+    _line_cross, _poly_inside = _line_cross_np, _poly_inside_np
+
+
+def line_cross_batch(
+    prev_xy: np.ndarray,
+    curr_xy: np.ndarray,
+    line_xy: np.ndarray,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Check which movement segments properly cross a line segment.
+
+    Args:
+        prev_xy: (N, 2) previous centers
+        curr_xy: (N, 2) current centers
+        line_xy: (2, 2) line endpoints
+        out: Optional (N,) boolean array to write into instead of allocating
+
+    Returns:
+        (N,) boolean array, True where prev -> curr crosses the line
+    """
+    if out is None:
+        out = np.empty(len(curr_xy), dtype=np.bool_)
+    return _line_cross(prev_xy, curr_xy, line_xy, out)
+
+
+def poly_inside_batch(xy: np.ndarray, edges: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Check which points lie inside a simple polygon.
+
+    Args:
+        xy: (N, 2) query points
+        edges: (M, 2, 2) polygon edges from polygon_edges()
+        out: Optional (N,) boolean array to write into instead of allocating
+
+    Returns:
+        (N,) boolean array, True where the point is inside
+    """
+    if out is None:
+        out = np.empty(len(xy), dtype=np.bool_)
+    return _poly_inside(xy, edges, out)
+
+
+def warmup() -> None:
+    """Compile (or load cached) kernels so the first frame doesn't pay JIT cost."""
+    points = np.zeros((1, 2), dtype=np.float64)
+    square = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    line_cross_batch(points, points, square[:2])
+    poly_inside_batch(points, polygon_edges(square))
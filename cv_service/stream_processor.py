@@ -1,50 +1,31 @@
 """Stream processor with ROI-based enter/exit detection."""
 import cv2
 import json
-import uuid
 import numpy as np
+import queue
 import threading
-from dataclasses import dataclass, field
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple, Union
 import structlog
 
 from cv_service.config import cv_config
 from cv_service.detector import PersonDetector
-from cv_service.event_builder import CVEventBuilder
-from cv_service.client import CVAPIClient
+from cv_service.opencv_dnn_detector import OpenCVDNNDetector
+from cv_service.batch_inference import BatchedDetector, StreamTracker, get_batched_detector
+from cv_service.event_builder import CVEventBuilder, EventRow
+from cv_service.gpu_decode import CudaVideoReader, open_cuda_reader
+from cv_service.gpu_transfer import PinnedFrameUploader, upload_frame
+from cv_service.client import get_shared_client
 from schemas.cv_event import ActionType
 from cv_service.roi import ROIBase, ROIConfigError, ROIState, build_rois
-
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        structlog.processors.JSONRenderer()
-    ]
-)
+from cv_service.track_table import TrackTable
+from cv_service import roi_kernels
 
 logger = structlog.get_logger()
 
-
-@dataclass
-class TrackState:
-    """Track state with ROI tracking."""
-    track_id: int
-    first_seen_time: datetime
-    last_seen_time: datetime
-    customer_id: uuid.UUID
-    last_center: Optional[Tuple[int, int]] = None
-    confidence_sum: float = 0.0
-    confidence_count: int = 0
-    rois: Dict[str, ROIState] = field(default_factory=dict)
-
-    @property
-    def confidence_avg(self) -> Optional[float]:
-        if self.confidence_count == 0:
-            return None
-        return self.confidence_sum / self.confidence_count
+NS_PER_SECOND = 1_000_000_000
 
 
 class StreamProcessor:
@@ -63,35 +44,75 @@ class StreamProcessor:
         self.video_source = video_source or self.config.video_source
         self.roi_coordinates = roi_coordinates or self.config.roi_coordinates
 
-        self.detector = PersonDetector(
-            model_path=self.config.yolo_model_path,
-            confidence_threshold=self.config.yolo_confidence_threshold
-        )
-        self.api_client = CVAPIClient(self.config.api_base_url)
+        self.batched_detector: Optional[BatchedDetector] = None
+        if self.config.batch_inference:
+            self.batched_detector = get_batched_detector(
+                model_path=self.config.yolo_model_path,
+                confidence_threshold=self.config.yolo_confidence_threshold,
+                use_tensorrt=self.config.use_tensorrt or self.config.detector_backend == "trt",
+                imgsz=self.config.inference_size or 640,
+                batch_max=self.config.inference_batch_max,
+                batch_window_ms=self.config.inference_batch_window_ms
+            )
+            self.detector = self.batched_detector.detector
+            self._stream_tracker = StreamTracker()
+        elif self.config.detector_backend == "opencv_dnn":
+            self.detector = OpenCVDNNDetector(
+                model_path=self.config.yolo_model_path,
+                confidence_threshold=self.config.yolo_confidence_threshold,
+                imgsz=self.config.inference_size or 640
+            )
+        else:
+            self.detector = PersonDetector(
+                model_path=self.config.yolo_model_path,
+                confidence_threshold=self.config.yolo_confidence_threshold,
+                use_tensorrt=self.config.use_tensorrt or self.config.detector_backend == "trt",
+                imgsz=self.config.inference_size or 640
+            )
+        self.api_client = get_shared_client(self.config.api_base_url)
         self.camera_id = camera_id or self.config.camera_id
+        self.log = logger.bind(branch_id=self.branch_id, camera_id=self.camera_id)
 
         # ROI configuration
         self.rois = self._load_rois(rois)
+        self._roi_hits = np.zeros((len(self.rois), 64), dtype=bool)
+        roi_kernels.warmup()
 
         # Track state management
-        self.track_states: Dict[int, TrackState] = {}
+        self.tracks = TrackTable()
+
+        # Event batching: the frame thread only appends; a flush thread drains.
+        # Unbounded on purpose: these rows feed the KPIs, so a slow API must not drop them
+        self.event_buffer: Deque[EventRow] = deque()
+        self._flush_wakeup = threading.Event()
+
+        # Reusable inference buffer; _scale maps its boxes back to frame coords
+        self._small: Optional[np.ndarray] = None
+        self._scale = 1.0
+        self._device_preprocess = (
+            (self.config.gpu_preprocess or self.config.pinned_upload)
+            and self.batched_detector is None
+            and isinstance(self.detector, PersonDetector)
+        )
+        self._uploader: Optional[PinnedFrameUploader] = None
+        if self._device_preprocess and self.config.pinned_upload:
+            self._uploader = PinnedFrameUploader()
 
-        # Event batching
-        self.event_buffer: List[dict] = []
-        self.last_flush_time = datetime.utcnow()
+        # Motion gate: thumbnail from the last detected frame, frames skipped since
+        self._motion_ref: Optional[np.ndarray] = None
+        self._skipped_frames = 0
 
         # Graceful stop support
         self._stop_event = threading.Event()
 
-        logger.info(
+        self.log.info(
             "Stream processor initialized",
-            branch_id=self.branch_id,
             video_source=self.video_source,
             roi_count=len(self.rois)
         )
 
     def stop(self) -> None:
-        logger.info("Stop requested", branch_id=self.branch_id)
+        self.log.info("Stop requested")
         self._stop_event.set()
 
     def _parse_roi(self, roi_str: str) -> List[Dict]:
@@ -116,47 +137,119 @@ class StreamProcessor:
         roi_configs = self._parse_roi(self.roi_coordinates)
         return build_rois(roi_configs)
 
-    def get_track_center(self, bbox: Tuple[int, int, int, int]) -> Tuple[int, int]:
+    @staticmethod
+    def get_track_center(bbox: Tuple[int, int, int, int]) -> Tuple[int, int]:
         x1, y1, x2, y2 = bbox
-        cx = int((x1 + x2) / 2)
-        cy = int((y1 + y2) / 2)
-        return cx, cy
-
-    def _get_track_state(self, track_id: int, frame_time: datetime) -> TrackState:
-        if track_id not in self.track_states:
-            self.track_states[track_id] = TrackState(
-                track_id=track_id,
-                first_seen_time=frame_time,
-                last_seen_time=frame_time,
-                customer_id=uuid.uuid4()
-            )
-        return self.track_states[track_id]
+        return (x1 + x2) >> 1, (y1 + y2) >> 1
+
+    def _open_capture(self) -> Union[cv2.VideoCapture, CudaVideoReader]:
+        """Open the source with bounded open/read timeouts so stalls surface as failed reads."""
+        # Batched inference and cv2.dnn take host frames, so NVDEC only applies to the
+        # per-stream Ultralytics path
+        if self.config.gpu_decode and self.batched_detector is None and isinstance(self.detector, PersonDetector):
+            reader = open_cuda_reader(self.video_source)
+            if reader is not None:
+                return reader
+
+        timeout_ms = self.config.stream_timeout_seconds * 1000
+        return cv2.VideoCapture(
+            self.video_source,
+            cv2.CAP_ANY,
+            [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms]
+        )
 
-    def _buffer_event(self, event_data: dict) -> None:
-        self.event_buffer.append(event_data)
+    def _prepare_inference_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a frame into the reusable inference buffer (aspect preserved)."""
+        target = self.config.inference_size
+        height, width = frame.shape[:2]
+        longest = max(height, width)
+        if target <= 0 or longest <= target:
+            self._scale = 1.0
+            return frame
+
+        size = (max(1, round(width * target / longest)), max(1, round(height * target / longest)))
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        self._scale = longest / target
+        return self._small
+
+    def _should_detect(self, frame: np.ndarray) -> bool:
+        """Gate inference on motion since the last detected frame, bounded by frame_skip_max."""
+        if self.config.frame_skip_max <= 0 or not isinstance(frame, np.ndarray):
+            return True
+
+        thumb = cv2.cvtColor(cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        # Compare against the last *detected* frame so slow drift still accumulates
+        if (
+            self._motion_ref is None
+            or self._skipped_frames >= self.config.frame_skip_max
+            or cv2.absdiff(thumb, self._motion_ref).mean() >= self.config.motion_threshold
+        ):
+            self._motion_ref = thumb
+            self._skipped_frames = 0
+            return True
+
+        self._skipped_frames += 1
+        return False
+
+    def _device_inference_ratio(self, width: int, height: int) -> float:
+        """Downscale ratio for on-device letterboxing; sets the box scale to match."""
+        longest = max(width, height)
+        ratio = min(1.0, self.config.inference_size / longest) if self.config.inference_size > 0 else 1.0
+        self._scale = 1.0 / ratio
+        return ratio
+
+    def _track_gpu(self, gpu_frame: "cv2.cuda.GpuMat"):
+        """Detect and track on a GPU-resident frame, letterboxed on device."""
+        return self.detector.track_gpumat(gpu_frame, self._device_inference_ratio(*gpu_frame.size()))
+
+    def _track_device(self, frame: np.ndarray):
+        """Upload a host frame (pinned when enabled), then letterbox and detect on the device."""
+        height, width = frame.shape[:2]
+        ratio = self._device_inference_ratio(width, height)
+        gpu_frame = self._uploader.upload(frame) if self._uploader is not None else upload_frame(frame)
+        return self.detector.track_tensor(gpu_frame, ratio)
+
+    def _track(self, frame: np.ndarray):
+        """Detect and track persons, through the shared batch when enabled."""
+        if self.batched_detector is None:
+            return self.detector.track(frame)
+        result = self.batched_detector.infer(frame)
+        return self._stream_tracker.update(result, frame)
+
+    def _buffer_event(self, event_row: EventRow) -> None:
+        self.event_buffer.append(event_row)
 
     def _flush_events(self) -> None:
-        if not self.event_buffer:
+        # popleft is atomic, so draining is safe while the frame thread appends
+        rows = []
+        for _ in range(len(self.event_buffer)):
+            try:
+                rows.append(self.event_buffer.popleft())
+            except IndexError:
+                break
+        if not rows:
             return
 
-        events = self.event_buffer
-        self.event_buffer = []
-
         try:
+            events = CVEventBuilder.build_events(rows, branch_id=self.branch_id, camera_id=self.camera_id)
             # Non-blocking: Add to the internal client queue
             self.api_client.enqueue_batch(events)
         except Exception as exc:
-            logger.error("Failed to enqueue batch events", error=str(exc))
+            self.log.error("Failed to enqueue batch events", error=str(exc))
 
-    def _maybe_flush_events(self, frame_time: datetime) -> None:
+    def _maybe_flush_events(self) -> None:
         if len(self.event_buffer) >= self.config.batch_max_size:
-            self._flush_events()
-            self.last_flush_time = frame_time
-            return
+            self._flush_wakeup.set()
 
-        if (frame_time - self.last_flush_time).total_seconds() >= self.config.batch_interval_seconds:
+    def _flush_loop(self) -> None:
+        """Flush buffered events every batch interval, or early when woken by a full batch."""
+        while not self._stop_event.is_set():
+            self._flush_wakeup.wait(timeout=self.config.batch_interval_seconds)
+            self._flush_wakeup.clear()
             self._flush_events()
-            self.last_flush_time = frame_time
 
     def _emit_event(
         self,
@@ -168,204 +261,267 @@ class StreamProcessor:
         frame_time: datetime,
         confidence_avg: Optional[float]
     ) -> None:
-        event_data = CVEventBuilder.build_event(
-            customer_id=self.track_states[track_id].customer_id,
-            branch_id=self.branch_id,
-            enter_time=enter_time,
-            exit_time=exit_time,
-            action_type=action_type,
-            camera_id=self.camera_id,
-            roi_id=roi_id,
-            track_id=track_id,
-            dwell_time_seconds=(exit_time - enter_time).total_seconds() if exit_time else None,
-            confidence_avg=confidence_avg,
-            frame_time=frame_time
+        # Buffer a plain row; payload dicts are built off the frame thread at flush time
+        customer_id = self.tracks.customer_ids[self.tracks.id_to_idx[track_id]]
+        self._buffer_event(
+            (customer_id, track_id, action_type, roi_id, enter_time, exit_time, frame_time, confidence_avg)
         )
-        self._buffer_event(event_data)
 
-    # ✅ FIX: accept prev_center for correct LINE crossing detection
+    def _compute_roi_hits(self, prev_xy: np.ndarray, curr_xy: np.ndarray) -> np.ndarray:
+        """(num_rois, num_tracks) hit matrix: crossed for line ROIs, inside for polygon ROIs."""
+        count = len(curr_xy)
+        if count > self._roi_hits.shape[1]:
+            self._roi_hits = np.zeros((len(self.rois), max(count, 2 * self._roi_hits.shape[1])), dtype=bool)
+
+        # Kernels write straight into rows of the reused matrix
+        hits = self._roi_hits[:, :count]
+        for row, roi in zip(hits, self.rois):
+            if roi.roi_type == "line":
+                roi.crossed_batch(prev_xy, curr_xy, out=row)
+            else:
+                roi.is_inside_batch(curr_xy, out=row)
+        return hits
+
     def process_roi_events(
         self,
-        track_id: int,
-        prev_center: Optional[Tuple[int, int]],
-        center: Tuple[int, int],
+        track_ids: List[int],
+        rows: List[int],
+        roi_hits: np.ndarray,
         frame_time: datetime
     ) -> None:
-        track_state = self._get_track_state(track_id, frame_time)
-
-        for roi in self.rois:
-            roi_state = track_state.rois.setdefault(roi.roi_id, ROIState())
+        """Apply this frame's ROI hit matrix to track ROI state, emitting events."""
+        for roi, hits in zip(self.rois, roi_hits):
+            is_line = roi.roi_type == "line"
+
+            for track_id, row, hit in zip(track_ids, rows, hits.tolist()):
+                roi_state = self.tracks.roi_states[row].setdefault(roi.roi_id, ROIState())
+
+                # LINE ROI: crossed trigger
+                if is_line:
+                    if hit and not roi_state.entered_sent:
+                        roi_state.entered_sent = True
+                        roi_state.roi_enter_time = frame_time
+                        self._emit_event(
+                            track_id=track_id,
+                            action_type=ActionType.ENTERED,
+                            roi_id=roi.roi_id,
+                            enter_time=frame_time,
+                            exit_time=None,
+                            frame_time=frame_time,
+                            confidence_avg=self.tracks.confidence_avg(row)
+                        )
+                    continue
 
-            # LINE ROI: crossed trigger
-            if roi.roi_type == "line":
-                crossed = roi.crossed(prev_center, center)
-                if crossed and not roi_state.entered_sent:
-                    roi_state.entered_sent = True
+                # POLYGON ROI: inside/outside
+                # Enter transition
+                if (not roi_state.inside) and hit:
+                    roi_state.inside = True
                     roi_state.roi_enter_time = frame_time
-                    self._emit_event(
-                        track_id=track_id,
-                        action_type=ActionType.ENTERED,
-                        roi_id=roi.roi_id,
-                        enter_time=frame_time,
-                        exit_time=None,
-                        frame_time=frame_time,
-                        confidence_avg=track_state.confidence_avg
-                    )
-                continue
 
-            # POLYGON ROI: inside/outside
-            inside = roi.is_inside(center)
-
-            # Enter transition
-            if (not roi_state.inside) and inside:
-                roi_state.inside = True
-                roi_state.roi_enter_time = frame_time
-
-                if not roi_state.entered_sent:
-                    roi_state.entered_sent = True
-                    self._emit_event(
-                        track_id=track_id,
-                        action_type=ActionType.ENTERED,
-                        roi_id=roi.roi_id,
-                        enter_time=frame_time,
-                        exit_time=None,
-                        frame_time=frame_time,
-                        confidence_avg=track_state.confidence_avg
-                    )
-
-            # Exit transition
-            elif roi_state.inside and (not inside):
-                roi_state.inside = False
-
-                # ✅ FIX: DO NOT use ActionType.EXITED (doesn't exist)
-                # Exit is represented by exit_time filled.
-                if (not roi_state.exited_sent) and roi_state.roi_enter_time:
-                    roi_state.exited_sent = True
-                    self._emit_event(
-                        track_id=track_id,
-                        action_type=ActionType.ENTERED,  # keep contract
-                        roi_id=roi.roi_id,
-                        enter_time=roi_state.roi_enter_time,
-                        exit_time=frame_time,
-                        frame_time=frame_time,
-                        confidence_avg=track_state.confidence_avg
-                    )
-
-    def _cleanup_stale_tracks(self, now: datetime) -> None:
+                    if not roi_state.entered_sent:
+                        roi_state.entered_sent = True
+                        self._emit_event(
+                            track_id=track_id,
+                            action_type=ActionType.ENTERED,
+                            roi_id=roi.roi_id,
+                            enter_time=frame_time,
+                            exit_time=None,
+                            frame_time=frame_time,
+                            confidence_avg=self.tracks.confidence_avg(row)
+                        )
+
+                # Exit transition
+                elif roi_state.inside and (not hit):
+                    roi_state.inside = False
+
+                    # ✅ FIX: DO NOT use ActionType.EXITED (doesn't exist)
+                    # Exit is represented by exit_time filled.
+                    if (not roi_state.exited_sent) and roi_state.roi_enter_time:
+                        roi_state.exited_sent = True
+                        self._emit_event(
+                            track_id=track_id,
+                            action_type=ActionType.ENTERED,  # keep contract
+                            roi_id=roi.roi_id,
+                            enter_time=roi_state.roi_enter_time,
+                            exit_time=frame_time,
+                            frame_time=frame_time,
+                            confidence_avg=self.tracks.confidence_avg(row)
+                        )
+
+    def _cleanup_stale_tracks(self, now_ns: int) -> None:
         ttl = getattr(self.config, "track_ttl_seconds", 10)
-        stale_ids = []
-        for track_id, state in self.track_states.items():
-            if (now - state.last_seen_time).total_seconds() > ttl:
-                stale_ids.append(track_id)
+        self.tracks.vacuum(now_ns, int(ttl * NS_PER_SECOND))
+
+    @staticmethod
+    def _put_latest(frame_q: queue.Queue, item) -> None:
+        """Put into a single-slot queue, replacing an item the consumer hasn't taken."""
+        try:
+            frame_q.get_nowait()
+        except queue.Empty:
+            pass
+        frame_q.put_nowait(item)
+
+    def _capture_loop(
+        self,
+        cap: Union[cv2.VideoCapture, CudaVideoReader],
+        frame_q: queue.Queue,
+        stop: threading.Event
+    ) -> None:
+        """Read frames until stopped or the stream dies, then queue a None sentinel."""
+        failed_reads = 0
+        last_good_frame_ns = time.monotonic_ns()
+
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                # Ride out transient drops on the same capture; only a
+                # sustained stall tears it down and reconnects.
+                failed_reads += 1
+                stalled_ns = time.monotonic_ns() - last_good_frame_ns
+                if stalled_ns > self.config.freeze_reconnect_seconds * NS_PER_SECOND:
+                    self.log.warning("Stream frozen - reconnecting")
+                    break
+                if failed_reads > self.config.read_retry_attempts:
+                    self.log.warning("Stream disconnected or ended")
+                    break
+                continue
 
-        for tid in stale_ids:
-            del self.track_states[tid]
+            failed_reads = 0
+            last_good_frame_ns = time.monotonic_ns()
+            self._put_latest(frame_q, (last_good_frame_ns, frame))
+
+        self._put_latest(frame_q, None)
 
     def run(self):
-        logger.info("Starting stream processor", branch_id=self.branch_id)
+        self.log.info("Starting stream processor")
 
-        heartbeat_time = datetime.utcnow()
-        last_good_frame_time = datetime.utcnow()
+        heartbeat_ns = time.monotonic_ns()
+        flush_thread = threading.Thread(
+            target=self._flush_loop,
+            name=f"StreamFlush-{self.branch_id}",
+            daemon=True
+        )
+        flush_thread.start()
 
         while not self._stop_event.is_set():
-            cap = cv2.VideoCapture(self.video_source)
+            cap = self._open_capture()
 
             if not cap.isOpened():
-                logger.error("Failed to open video source", source=self.video_source)
-                import time
+                self.log.error("Failed to open video source", source=self.video_source)
                 time.sleep(getattr(self.config, "reconnect_delay_seconds", 2))
                 continue
 
             frame_count = 0
+            self._motion_ref = None
+
+            # Decode on its own thread so it overlaps inference; only the newest frame is kept
+            frame_q: "queue.Queue[Optional[Tuple[int, np.ndarray]]]" = queue.Queue(maxsize=1)
+            capture_stop = threading.Event()
+            capture_thread = threading.Thread(
+                target=self._capture_loop,
+                args=(cap, frame_q, capture_stop),
+                name=f"StreamCapture-{self.branch_id}",
+                daemon=True
+            )
+            capture_thread.start()
 
             try:
                 while not self._stop_event.is_set():
-                    ret, frame = cap.read()
-                    if not ret:
-                        logger.warning("Stream disconnected or ended", branch_id=self.branch_id)
+                    try:
+                        item = frame_q.get(timeout=1.0)
+                    except queue.Empty:
+                        continue
+                    if item is None:
                         break
 
+                    # Monotonic clock for all internal timing; wall clock only for event payloads
+                    now_ns, frame = item
                     frame_count += 1
                     frame_time = datetime.utcnow()
-                    last_good_frame_time = frame_time
 
-                    results = self.detector.track(frame)
-                    track_centers: Dict[int, Tuple[int, int]] = {}
+                    # Static frames skip inference; tracks and ROI state carry over unchanged
+                    if not self._should_detect(frame):
+                        results = []
+                    elif isinstance(cap, CudaVideoReader):
+                        results = self._track_gpu(frame)
+                    elif self._device_preprocess:
+                        results = self._track_device(frame)
+                    else:
+                        results = self._track(self._prepare_inference_frame(frame))
+                    track_ids: List[int] = []
+                    rows: List[int] = []
+                    prev_chunks: List[np.ndarray] = []
+                    curr_chunks: List[np.ndarray] = []
 
                     for result in results:
                         boxes = result.boxes
-                        if boxes is None:
+                        if boxes is None or boxes.id is None:
                             continue
 
-                        for box in boxes:
-                            if box.id is None:
-                                continue
-
-                            class_id = int(box.cls[0])
-                            if class_id != self.detector.PERSON_CLASS_ID:
-                                continue
-
-                            confidence = float(box.conf[0])
-                            if confidence < self.config.yolo_confidence_threshold:
-                                continue
-
-                            track_id = int(box.id[0])
-                            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-
-                            center = self.get_track_center((int(x1), int(y1), int(x2), int(y2)))
-                            track_centers[track_id] = center
-
-                            track_state = self._get_track_state(track_id, frame_time)
-
-                            # ✅ FIX: capture prev_center BEFORE updating last_center
-                            prev_center = track_state.last_center
-
-                            track_state.last_seen_time = frame_time
-                            track_state.last_center = center
-                            track_state.confidence_sum += confidence
-                            track_state.confidence_count += 1
-
-                            # ✅ process ROI using prev + curr
-                            self.process_roi_events(track_id, prev_center, center, frame_time)
+                        # One bulk device -> host copy per field instead of per-box scalar syncs
+                        xyxy = (boxes.xyxy.cpu().numpy() * self._scale).astype(np.int32)
+                        confs = boxes.conf.cpu().numpy()
+                        clses = boxes.cls.cpu().numpy().astype(np.int32)
+                        ids = boxes.id.cpu().numpy().astype(np.int32)
+
+                        keep = (clses == self.detector.PERSON_CLASS_ID) & (confs >= self.config.yolo_confidence_threshold)
+                        xyxy = xyxy[keep]
+                        centers = (xyxy[:, :2] + xyxy[:, 2:]) >> 1
+
+                        result_ids = ids[keep].tolist()
+                        idx = self.tracks.get_or_create_many(result_ids)
+
+                        # ✅ FIX: capture prev_center BEFORE updating last_center
+                        # (a new track gets a zero-length segment, which never crosses)
+                        prev_chunks.append(self.tracks.previous_centers(idx, centers))
+                        curr_chunks.append(centers)
+                        self.tracks.update_many(idx, centers, confs[keep], now_ns)
+
+                        track_ids.extend(result_ids)
+                        rows.extend(idx.tolist())
+
+                    # ✅ process ROI using prev + curr, batched over all tracks in the frame
+                    if track_ids:
+                        roi_hits = self._compute_roi_hits(
+                            np.concatenate(prev_chunks).astype(np.float64),
+                            np.concatenate(curr_chunks).astype(np.float64)
+                        )
+                        self.process_roi_events(track_ids, rows, roi_hits, frame_time)
 
-                    self._maybe_flush_events(frame_time)
-                    self._cleanup_stale_tracks(frame_time)
+                    self._maybe_flush_events()
+                    self._cleanup_stale_tracks(now_ns)
 
                     if frame_count % 100 == 0:
-                        logger.info(
+                        self.log.info(
                             "Processing progress",
-                            branch_id=self.branch_id,
                             frame_count=frame_count,
-                            active_tracks=len(track_centers)
+                            active_tracks=len(track_ids)
                         )
 
-                    freeze_seconds = getattr(self.config, "freeze_reconnect_seconds", 10)
-                    if (datetime.utcnow() - last_good_frame_time).total_seconds() > freeze_seconds:
-                        logger.warning("Stream frozen - reconnecting", branch_id=self.branch_id)
-                        break
-
-                    if (frame_time - heartbeat_time).total_seconds() >= self.config.heartbeat_interval_seconds:
-                        logger.info(
+                    if now_ns - heartbeat_ns >= self.config.heartbeat_interval_seconds * NS_PER_SECOND:
+                        self.log.info(
                             "Stream heartbeat",
-                            branch_id=self.branch_id,
                             frame_count=frame_count,
-                            active_tracks=len(track_centers)
+                            active_tracks=len(track_ids)
                         )
-                        heartbeat_time = frame_time
+                        heartbeat_ns = now_ns
 
             except Exception as e:
-                logger.error("Error in processing loop", branch_id=self.branch_id, error=str(e))
+                self.log.error("Error in processing loop", error=str(e))
 
             finally:
+                capture_stop.set()
+                capture_thread.join()
                 cap.release()
                 self._flush_events()
-                logger.info("Stream released", branch_id=self.branch_id)
+                self.log.info("Stream released")
 
                 if not self._stop_event.is_set():
-                    import time
                     time.sleep(getattr(self.config, "reconnect_delay_seconds", 2))
 
-        logger.info("Stream processor stopped", branch_id=self.branch_id)
+        self._flush_wakeup.set()
+        flush_thread.join()
+        self.log.info("Stream processor stopped")
 
 
 if __name__ == "__main__":
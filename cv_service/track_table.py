@@ -0,0 +1,131 @@
+"""Structure-of-arrays track state for the stream processor."""
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cv_service.roi import ROIState
+
+
+class TrackTable:
+    """
+    Per-track state stored as parallel NumPy columns indexed by row.
+
+    Rows are compacted by vacuum(), so row indices are only valid until the
+    next vacuum; look them up again with get_or_create() each frame.
+    """
+
+    def __init__(self, capacity: int = 256):
+        """
+        Initialize an empty table.
+
+        Args:
+            capacity: Initial number of rows; doubled whenever it is exceeded
+        """
+        self.size = 0
+        self.id_to_idx: Dict[int, int] = {}
+
+        self.track_id = np.zeros(capacity, dtype=np.int64)
+        self.last_center_xy = np.zeros((capacity, 2), dtype=np.int32)
+        self.confidence_sum = np.zeros(capacity, dtype=np.float32)
+        self.confidence_count = np.zeros(capacity, dtype=np.int32)
+        self.last_seen_ns = np.zeros(capacity, dtype=np.int64)
+
+        # Non-numeric per-row state, kept in the same row order
+        self.customer_ids: List[uuid.UUID] = []
+        self.roi_states: List[Dict[str, ROIState]] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.track_id)
+        for name in ("track_id", "last_center_xy", "confidence_sum", "confidence_count", "last_seen_ns"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def get_or_create(self, track_id: int) -> int:
+        """Return the row for a track ID, appending a fresh row for unseen tracks."""
+        idx = self.id_to_idx.get(track_id)
+        if idx is not None:
+            return idx
+
+        if self.size == len(self.track_id):
+            self._grow()
+
+        idx = self.size
+        self.size += 1
+        self.id_to_idx[track_id] = idx
+        self.track_id[idx] = track_id
+        self.confidence_sum[idx] = 0.0
+        self.confidence_count[idx] = 0
+        self.customer_ids.append(uuid.uuid4())
+        self.roi_states.append({})
+        return idx
+
+    def get_or_create_many(self, track_ids: List[int]) -> np.ndarray:
+        """Rows for a frame's track IDs; only unseen IDs take the slow append path."""
+        lookup = self.id_to_idx.get
+        rows = [lookup(track_id) for track_id in track_ids]
+        if None in rows:
+            rows = [
+                self.get_or_create(track_id) if row is None else row
+                for track_id, row in zip(track_ids, rows)
+            ]
+        return np.asarray(rows, dtype=np.intp)
+
+    def update(self, idx: int, cx: int, cy: int, conf: float, t_ns: int) -> None:
+        """Record one detection for a row."""
+        self.last_center_xy[idx] = (cx, cy)
+        self.confidence_sum[idx] += conf
+        self.confidence_count[idx] += 1
+        self.last_seen_ns[idx] = t_ns
+
+    def update_many(self, idx: np.ndarray, centers: np.ndarray, confs: np.ndarray, t_ns: int) -> None:
+        """Record one detection for each of several distinct rows."""
+        self.last_center_xy[idx] = centers
+        self.confidence_sum[idx] += confs
+        self.confidence_count[idx] += 1
+        self.last_seen_ns[idx] = t_ns
+
+    def previous_centers(self, idx: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Last known centers for rows, falling back to the current center for new tracks."""
+        seen = self.confidence_count[idx] > 0
+        return np.where(seen[:, None], self.last_center_xy[idx], centers)
+
+    def confidence_avg(self, idx: int) -> Optional[float]:
+        count = self.confidence_count[idx]
+        if count == 0:
+            return None
+        return float(self.confidence_sum[idx] / count)
+
+    def vacuum(self, now_ns: int, ttl_ns: int) -> List[int]:
+        """
+        Drop tracks not seen within the TTL and compact the remaining rows.
+
+        Args:
+            now_ns: Current monotonic time in nanoseconds
+            ttl_ns: Track time-to-live in nanoseconds
+
+        Returns:
+            Track IDs that were removed
+        """
+        stale = (now_ns - self.last_seen_ns[:self.size]) > ttl_ns
+        if not stale.any():
+            return []
+
+        removed = self.track_id[:self.size][stale].tolist()
+        keep = ~stale
+        kept = int(keep.sum())
+
+        for column in (self.track_id, self.last_center_xy, self.confidence_sum, self.confidence_count, self.last_seen_ns):
+            column[:kept] = column[:self.size][keep]
+        keep_rows = keep.tolist()
+        self.customer_ids = [value for value, k in zip(self.customer_ids, keep_rows) if k]
+        self.roi_states = [value for value, k in zip(self.roi_states, keep_rows) if k]
+
+        self.size = kept
+        self.id_to_idx = {track_id: idx for idx, track_id in enumerate(self.track_id[:kept].tolist())}
+        return removed
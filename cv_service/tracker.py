@@ -1,4 +1,6 @@
 """ByteTrack multi-object tracker with UUID generation."""
+import os
+import time
 import uuid
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
@@ -6,43 +8,81 @@ from datetime import datetime
 import numpy as np
 import structlog
 
+from cv_service import tracker_kernels
+
 logger = structlog.get_logger()
 
+# Minimum IoU for a detection to continue an existing track
+IOU_THRESHOLD = 0.3
+
+# Number of recent center points kept per track
+HISTORY_LENGTH = 30
+
 
 class Track:
     """Individual track with UUID and state."""
     
-    def __init__(self, track_id: int, bbox: Tuple[int, int, int, int]):
+    def __init__(
+        self,
+        track_id: int,
+        bbox: Tuple[int, int, int, int],
+        now_ts: Optional[float] = None,
+        enter_time: Optional[datetime] = None,
+        customer_uuid_bytes: Optional[bytes] = None
+    ):
         """
         Initialize track.
         
         Args:
             track_id: Numeric track ID from tracker
             bbox: Initial bounding box
+            now_ts: Creation time from time.monotonic() (read now if omitted)
+            enter_time: Wall-clock creation time (read now if omitted)
+            customer_uuid_bytes: 16 random bytes for the customer UUID (drawn now if omitted)
         """
         self.track_id = track_id
-        self.customer_id = uuid.uuid4()  # Generate UUID v4
+        if customer_uuid_bytes is None:
+            self.customer_id = uuid.uuid4()  # Generate UUID v4
+        else:
+            # Stamp the v4 version and RFC 4122 variant bits onto caller-drawn random bytes
+            raw = bytearray(customer_uuid_bytes)
+            raw[6] = (raw[6] & 0x0F) | 0x40
+            raw[8] = (raw[8] & 0x3F) | 0x80
+            self.customer_id = uuid.UUID(bytes=bytes(raw))
+        # Undashed hex form for logging
+        self.customer_id_hex = self.customer_id.hex
         self.bbox = bbox
-        self.enter_time = datetime.utcnow()
+        self.enter_time = enter_time or datetime.utcnow()
         self.exit_time: Optional[datetime] = None
-        self.last_seen = datetime.utcnow()
+        self.last_seen_ts = time.monotonic() if now_ts is None else now_ts
         self.crossed_roi = False
         self.inside_roi = False
-        self.history: List[Tuple[int, int]] = []  # Center point history
+        # Center point history as a ring buffer: _hist_idx is the next write position
+        self.history = np.empty((HISTORY_LENGTH, 2), dtype=np.int32)
+        self._hist_idx = 0
+        self._hist_len = 0
         
-    def update(self, bbox: Tuple[int, int, int, int]):
-        """Update track with new bounding box."""
+    def update(self, bbox: Tuple[int, int, int, int], now_ts: float, center: Optional[np.ndarray] = None):
+        """
+        Update track with new bounding box seen at monotonic time now_ts.
+
+        center is the box's precomputed (cx, cy); it is derived from bbox if omitted.
+        """
         self.bbox = bbox
-        self.last_seen = datetime.utcnow()
+        self.last_seen_ts = now_ts
         
-        # Update history
-        cx = int((bbox[0] + bbox[2]) / 2)
-        cy = int((bbox[1] + bbox[3]) / 2)
-        self.history.append((cx, cy))
-        
-        # Keep only last 30 positions
-        if len(self.history) > 30:
-            self.history.pop(0)
+        # Update history, overwriting the oldest point once full
+        if center is None:
+            center = ((bbox[0] + bbox[2]) // 2, (bbox[1] + bbox[3]) // 2)
+        self.history[self._hist_idx] = center
+        self._hist_idx = (self._hist_idx + 1) % HISTORY_LENGTH
+        self._hist_len = min(self._hist_len + 1, HISTORY_LENGTH)
+
+    def get_history(self) -> np.ndarray:
+        """Center point history as an (N, 2) array, oldest first."""
+        if self._hist_len < HISTORY_LENGTH:
+            return self.history[:self._hist_len].copy()
+        return np.roll(self.history, -self._hist_idx, axis=0)
 
 
 class ByteTracker:
@@ -51,18 +91,30 @@ class ByteTracker:
     Generates unique UUID v4 for each track.
     """
     
-    def __init__(self, max_age: int = 30, min_hits: int = 3):
+    def __init__(self, max_age: int = 30, min_hits: int = 3, capacity: int = 64):
         """
         Initialize ByteTrack tracker.
         
         Args:
             max_age: Maximum frames to keep track alive without detection
             min_hits: Minimum hits before track is confirmed
+            capacity: Initial number of track slots; doubled when exhausted
         """
         self.max_age = max_age
         self.min_hits = min_hits
         self.tracks: Dict[int, Track] = {}
         self.next_track_id = 1
+
+        # Track boxes live in one contiguous array, one slot per live track
+        self._bboxes = np.zeros((capacity, 4), dtype=np.float32)
+        self._areas = np.zeros(capacity, dtype=np.float32)
+        self._slot_track_id = np.zeros(capacity, dtype=np.int64)
+        self._active_mask = np.zeros(capacity, dtype=bool)
+        self._last_seen_ts = np.zeros(capacity, dtype=np.float64)
+        self._slot_of: Dict[int, int] = {}
+        self._free_slots: List[int] = list(range(capacity - 1, -1, -1))
+
+        tracker_kernels.warmup()
         
         logger.info("ByteTracker initialized", max_age=max_age, min_hits=min_hits)
     
@@ -79,89 +131,164 @@ class ByteTracker:
         # Simple tracking implementation (can be replaced with actual ByteTrack)
         # For production, use Ultralytics' built-in tracker
         
+        # One clock read per frame, shared by every track touched below
+        now_ts = time.monotonic()
+
         if not detections:
             # Age out tracks
-            self._age_tracks()
+            self._age_tracks(now_ts)
             return self.tracks
+
+        now = datetime.utcnow()
         
-        # Match detections to existing tracks (simple IoU matching)
-        matched_tracks = set()
-        
-        for det in detections:
+        # Match detections to existing tracks (greedy one-to-one assignment on IoU)
+        matched_slots = []
+        det_boxes = np.asarray(detections, dtype=np.float32)[:, :4]
+        # Every detection's center in one pass; matched tracks copy theirs into history
+        centers = ((det_boxes[:, :2] + det_boxes[:, 2:]) // 2).astype(np.int32)
+        # Areas are computed once per box: detections here, tracks when their slot box is written
+        det_areas = tracker_kernels.box_areas(det_boxes)
+        active_slots = np.flatnonzero(self._active_mask)
+        track_ids = self._slot_track_id[active_slots].tolist()
+        match_of = np.full(len(det_boxes), -1, dtype=np.intp)
+
+        if track_ids:
+            iou = self._iou_matrix(
+                det_boxes, self._bboxes[active_slots], det_areas, self._areas[active_slots], IOU_THRESHOLD
+            )
+            self._greedy_assign(iou, match_of)
+
+        # One urandom read covers the customer UUIDs of every new track this frame
+        random_bytes = os.urandom(16 * int((match_of < 0).sum()))
+        new_count = 0
+
+        for k, (det, match) in enumerate(zip(detections, match_of.tolist())):
             bbox = det[:4]
-            best_match = None
-            best_iou = 0.3  # Minimum IoU threshold
-            
-            # Find best matching track
-            for track_id, track in self.tracks.items():
-                iou = self._calculate_iou(bbox, track.bbox)
-                if iou > best_iou:
-                    best_iou = iou
-                    best_match = track_id
-            
-            if best_match is not None:
+
+            if match >= 0:
                 # Update existing track
-                self.tracks[best_match].update(bbox)
-                matched_tracks.add(best_match)
+                best_match = track_ids[match]
+                self.tracks[best_match].update(bbox, now_ts, centers[k])
+                slot = active_slots[match]
+                self._bboxes[slot] = det_boxes[k]
+                self._areas[slot] = det_areas[k]
+                self._last_seen_ts[slot] = now_ts
+                matched_slots.append(slot)
             else:
                 # Create new track
-                new_track = Track(self.next_track_id, bbox)
+                new_track = Track(
+                    self.next_track_id,
+                    bbox,
+                    now_ts,
+                    now,
+                    customer_uuid_bytes=random_bytes[16 * new_count:16 * (new_count + 1)]
+                )
+                new_count += 1
                 self.tracks[self.next_track_id] = new_track
-                matched_tracks.add(self.next_track_id)
+                slot = self._acquire_slot(self.next_track_id)
+                self._bboxes[slot] = det_boxes[k]
+                self._areas[slot] = det_areas[k]
+                self._last_seen_ts[slot] = now_ts
+                matched_slots.append(slot)
                 self.next_track_id += 1
-                
+
                 logger.info(
                     "New track created",
                     track_id=new_track.track_id,
-                    customer_id=str(new_track.customer_id)
+                    customer_id=new_track.customer_id_hex
                 )
-        
+
         # Age out unmatched tracks
-        self._age_tracks(matched_tracks)
+        matched_mask = np.zeros(len(self._active_mask), dtype=bool)
+        matched_mask[matched_slots] = True
+        self._age_tracks(now_ts, matched_mask)
         
         return self.tracks
     
-    def _calculate_iou(self, bbox1: Tuple[int, int, int, int], 
-                       bbox2: Tuple[int, int, int, int]) -> float:
-        """Calculate Intersection over Union between two bounding boxes."""
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
-        # Calculate intersection
-        x1_i = max(x1_1, x1_2)
-        y1_i = max(y1_1, y1_2)
-        x2_i = min(x2_1, x2_2)
-        y2_i = min(y2_1, y2_2)
-        
-        if x2_i < x1_i or y2_i < y1_i:
-            return 0.0
-        
-        intersection = (x2_i - x1_i) * (y2_i - y1_i)
-        
-        # Calculate union
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0.0
-    
-    def _age_tracks(self, matched_tracks: set = None):
+    @staticmethod
+    def _iou_matrix(
+        det_boxes: np.ndarray,
+        track_boxes: np.ndarray,
+        det_areas: Optional[np.ndarray] = None,
+        track_areas: Optional[np.ndarray] = None,
+        iou_threshold: float = 0.0
+    ) -> np.ndarray:
+        """
+        Calculate pairwise Intersection over Union between two sets of boxes.
+
+        Args:
+            det_boxes: (K, 4) detection boxes as x1, y1, x2, y2
+            track_boxes: (T, 4) track boxes as x1, y1, x2, y2
+            det_areas: Precomputed (K,) detection areas (computed if omitted)
+            track_areas: Precomputed (T,) track areas (computed if omitted)
+            iou_threshold: Pairs with IoU at or below this are returned as 0
+
+        Returns:
+            (K, T) IoU matrix
+        """
+        return tracker_kernels.iou_gated(
+            np.ascontiguousarray(det_boxes, dtype=np.float32),
+            np.ascontiguousarray(track_boxes, dtype=np.float32),
+            det_areas,
+            track_areas,
+            iou_threshold
+        )
+
+    @staticmethod
+    def _greedy_assign(iou: np.ndarray, match_of: np.ndarray) -> None:
+        """
+        Match pairs in descending IoU order, each detection and track at most once.
+
+        With short frame-to-frame motion this matches the optimal assignment in
+        practice, at the cost of one sort instead of a Hungarian solve.
+
+        Args:
+            iou: (K, T) IoU matrix with sub-threshold pairs already zeroed
+            match_of: (K,) array filled with the matched track column per detection
+        """
+        # Sub-threshold pairs are exactly 0, so only the first count_nonzero sorted pairs qualify
+        candidates = np.argsort(iou, axis=None, kind="stable")[::-1][:np.count_nonzero(iou)]
+        det_used = np.zeros(iou.shape[0], dtype=bool)
+        track_used = np.zeros(iou.shape[1], dtype=bool)
+        for row, col in zip(*np.unravel_index(candidates, iou.shape)):
+            if det_used[row] or track_used[col]:
+                continue
+            det_used[row] = track_used[col] = True
+            match_of[row] = col
+
+    def _age_tracks(self, now_ts: float, matched_mask: Optional[np.ndarray] = None):
         """Remove old tracks that haven't been seen recently."""
-        if matched_tracks is None:
-            matched_tracks = set()
+        evict = self._active_mask & ((now_ts - self._last_seen_ts) > self.max_age)
+        if matched_mask is not None:
+            evict &= ~matched_mask
         
-        current_time = datetime.utcnow()
-        tracks_to_remove = []
-        
-        for track_id, track in self.tracks.items():
-            if track_id not in matched_tracks:
-                age = (current_time - track.last_seen).total_seconds()
-                if age > self.max_age:
-                    tracks_to_remove.append(track_id)
-        
-        for track_id in tracks_to_remove:
+        for slot in np.flatnonzero(evict).tolist():
+            track_id = int(self._slot_track_id[slot])
             logger.info("Track aged out", track_id=track_id)
             del self.tracks[track_id]
+            self._release_slot(track_id)
+
+    def _acquire_slot(self, track_id: int) -> int:
+        """Reserve a box slot for a new track, doubling the slot arrays when full."""
+        if not self._free_slots:
+            capacity = len(self._bboxes)
+            self._bboxes = np.concatenate([self._bboxes, np.zeros_like(self._bboxes)])
+            self._areas = np.concatenate([self._areas, np.zeros_like(self._areas)])
+            self._slot_track_id = np.concatenate([self._slot_track_id, np.zeros_like(self._slot_track_id)])
+            self._active_mask = np.concatenate([self._active_mask, np.zeros_like(self._active_mask)])
+            self._last_seen_ts = np.concatenate([self._last_seen_ts, np.zeros_like(self._last_seen_ts)])
+            self._free_slots = list(range(2 * capacity - 1, capacity - 1, -1))
+
+        slot = self._free_slots.pop()
+        self._slot_of[track_id] = slot
+        self._slot_track_id[slot] = track_id
+        self._active_mask[slot] = True
+        return slot
+
+    def _release_slot(self, track_id: int) -> None:
+        slot = self._slot_of.pop(track_id)
+        self._active_mask[slot] = False
+        self._free_slots.append(slot)
     
     def get_track_by_id(self, track_id: int) -> Optional[Track]:
         """Get track by ID."""
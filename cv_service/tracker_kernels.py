@@ -0,0 +1,115 @@
+"""Detection/track IoU kernels, compiled with Numba when it is installed."""
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; the NumPy kernel is used instead
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+    """Areas of (N, 4) x1, y1, x2, y2 boxes."""
+    return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+
+@njit(cache=True, fastmath=True)
+def _iou_gated_jit(
+    det: np.ndarray,
+    trk: np.ndarray,
+    det_areas: np.ndarray,
+    trk_areas: np.ndarray,
+    iou_thr: float,
+    out: np.ndarray
+) -> np.ndarray:
+    # One pass over the pairs, written straight into out: no (K, T, 2) temporaries
+    for i in range(det.shape[0]):
+        dx1, dy1, dx2, dy2 = det[i, 0], det[i, 1], det[i, 2], det[i, 3]
+        for j in range(trk.shape[0]):
+            out[i, j] = 0.0
+            iw = min(dx2, trk[j, 2]) - max(dx1, trk[j, 0])
+            if iw <= 0:
+                continue
+            ih = min(dy2, trk[j, 3]) - max(dy1, trk[j, 1])
+            if ih <= 0:
+                continue
+            intersection = iw * ih
+            union = det_areas[i] + trk_areas[j] - intersection
+            if union > 0:
+                iou = intersection / union
+                if iou > iou_thr:
+                    out[i, j] = iou
+    return out
+
+
+def _iou_gated_np(
+    det: np.ndarray,
+    trk: np.ndarray,
+    det_areas: np.ndarray,
+    trk_areas: np.ndarray,
+    iou_thr: float,
+    out: np.ndarray
+) -> np.ndarray:
+    out[...] = 0.0
+
+    # Most pairs do not overlap horizontally; only those go on to the y/area math
+    iw = np.minimum(det[:, None, 2], trk[None, :, 2]) - np.maximum(det[:, None, 0], trk[None, :, 0])
+    rows, cols = np.nonzero(iw > 0)
+    if len(rows) == 0:
+        return out
+
+    d, t = det[rows], trk[cols]
+    ih = np.minimum(d[:, 3], t[:, 3]) - np.maximum(d[:, 1], t[:, 1])
+    intersection = iw[rows, cols] * np.clip(ih, 0, None)
+    union = det_areas[rows] + trk_areas[cols] - intersection
+
+    iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+    out[rows, cols] = np.where(iou > iou_thr, iou, 0.0)
+    return out
+
+
+_iou_gated = _iou_gated_jit if NUMBA_AVAILABLE else _iou_gated_np
+
+
+def iou_gated(
+    det: np.ndarray,
+    trk: np.ndarray,
+    det_areas: Optional[np.ndarray] = None,
+    trk_areas: Optional[np.ndarray] = None,
+    iou_thr: float = 0.0,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Pairwise IoU between detections and tracks, zeroed at or below a threshold.
+
+    Args:
+        det: (K, 4) float32 detection boxes as x1, y1, x2, y2
+        trk: (T, 4) float32 track boxes as x1, y1, x2, y2
+        det_areas: Precomputed (K,) detection areas (computed if omitted)
+        trk_areas: Precomputed (T,) track areas (computed if omitted)
+        iou_thr: Entries with IoU <= iou_thr are written as 0
+        out: Optional (K, T) float32 array to write into instead of allocating
+
+    Returns:
+        (K, T) IoU matrix
+    """
+    if det_areas is None:
+        det_areas = box_areas(det)
+    if trk_areas is None:
+        trk_areas = box_areas(trk)
+    if out is None:
+        out = np.empty((len(det), len(trk)), dtype=np.float32)
+    return _iou_gated(det, trk, det_areas, trk_areas, np.float32(iou_thr), out)
+
+
+def warmup() -> None:
+    """Compile (or load cached) kernels so the first frame doesn't pay JIT cost."""
+    boxes = np.zeros((1, 4), dtype=np.float32)
+    iou_gated(boxes, boxes)
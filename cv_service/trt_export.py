@@ -0,0 +1,51 @@
+"""TensorRT engine export for the YOLO person detector."""
+import argparse
+from pathlib import Path
+
+import structlog
+from ultralytics import YOLO
+
+logger = structlog.get_logger()
+
+
+def export_tensorrt_engine(model_path: str, imgsz: int = 640, half: bool = True, batch: int = 1) -> str:
+    """
+    Build an FP16 TensorRT engine next to the weights, reusing an existing one.
+
+    Args:
+        model_path: Path to YOLO weights (.pt) or an already built .engine
+        imgsz: Input size the engine is built for
+        half: Build with FP16 precision
+        batch: Maximum batch size (> 1 builds a dynamic-batch engine)
+
+    Returns:
+        Path to the TensorRT engine
+    """
+    weights = Path(model_path)
+    if weights.suffix == ".engine":
+        return model_path
+
+    # Static batch-1 engines keep Ultralytics' default name; batched ones are tagged
+    if batch == 1:
+        engine_path = weights.with_suffix(".engine")
+    else:
+        engine_path = weights.with_name(f"{weights.stem}-b{batch}.engine")
+    if engine_path.exists():
+        return str(engine_path)
+
+    logger.info("Exporting TensorRT engine", model_path=model_path, imgsz=imgsz, half=half, batch=batch)
+    exported = Path(YOLO(model_path).export(format="engine", half=half, imgsz=imgsz, batch=batch, dynamic=batch > 1))
+    if exported != engine_path:
+        exported.replace(engine_path)
+    logger.info("TensorRT engine exported", engine_path=str(engine_path))
+    return str(engine_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export YOLO weights to a TensorRT engine")
+    parser.add_argument("model_path", nargs="?", default="yolov8n.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=1, help="Maximum batch size")
+    parser.add_argument("--fp32", action="store_true", help="Build without FP16")
+    args = parser.parse_args()
+    export_tensorrt_engine(args.model_path, imgsz=args.imgsz, half=not args.fp32, batch=args.batch)
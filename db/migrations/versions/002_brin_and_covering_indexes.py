@@ -0,0 +1,47 @@
+"""BRIN time indexes and covering branch/time index.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15 08:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Movement rows arrive in time order, so a BRIN range index replaces the btree at a fraction of the size
+    op.drop_index('ix_customer_branch_movement_enter_time', table_name='customer_branch_movement')
+    op.create_index(
+        'ix_cbm_enter_time_brin', 'customer_branch_movement', ['enter_time'],
+        postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+    )
+
+    # Cover the columns analytics selects so branch/time range scans can be index-only
+    op.drop_index('ix_customer_branch_movement_branch_id_enter_time', table_name='customer_branch_movement')
+    op.create_index(
+        'ix_cbm_branch_enter_cov', 'customer_branch_movement', ['branch_id', 'enter_time'],
+        postgresql_include=['customer_id', 'action_type', 'exit_time']
+    )
+
+    op.drop_index('ix_branch_kpi_timeseries_time_window_start', table_name='branch_kpi_timeseries')
+    op.create_index(
+        'ix_bkt_time_window_start_brin', 'branch_kpi_timeseries', ['time_window_start'],
+        postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bkt_time_window_start_brin', table_name='branch_kpi_timeseries')
+    op.create_index('ix_branch_kpi_timeseries_time_window_start', 'branch_kpi_timeseries', ['time_window_start'])
+
+    op.drop_index('ix_cbm_branch_enter_cov', table_name='customer_branch_movement')
+    op.create_index('ix_customer_branch_movement_branch_id_enter_time', 'customer_branch_movement', ['branch_id', 'enter_time'])
+
+    op.drop_index('ix_cbm_enter_time_brin', table_name='customer_branch_movement')
+    op.create_index('ix_customer_branch_movement_enter_time', 'customer_branch_movement', ['enter_time'])
@@ -0,0 +1,100 @@
+"""Range-partition time-series tables by month.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.partitions import PARTITIONED_TABLES, month_partition_ddl, month_start
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Months to pre-create past the current one; pipelines/partitions.py keeps this rolling
+MONTHS_AHEAD = 1
+
+FOREIGN_KEYS = {
+    'customer_branch_movement': [
+        ('fk_customer_branch_movement_branch_id_branches', 'branches', ['branch_id'], ['id']),
+        ('fk_customer_branch_movement_customer_id_customers', 'customers', ['customer_id'], ['customer_id']),
+    ],
+    'branch_kpi_timeseries': [
+        ('fk_branch_kpi_timeseries_branch_id_branches', 'branches', ['branch_id'], ['id']),
+    ],
+}
+
+
+def _create_indexes(table: str) -> None:
+    """Indexes as of revision 002; on a partitioned parent they cascade to every partition."""
+    if table == 'customer_branch_movement':
+        op.create_index(
+            'ix_cbm_enter_time_brin', table, ['enter_time'],
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        )
+        op.create_index('ix_customer_branch_movement_exit_time', table, ['exit_time'])
+        op.create_index(
+            'ix_cbm_branch_enter_cov', table, ['branch_id', 'enter_time'],
+            postgresql_include=['customer_id', 'action_type', 'exit_time']
+        )
+    else:
+        op.create_index('ix_branch_kpi_timeseries_branch_id', table, ['branch_id'])
+        op.create_index(
+            'ix_bkt_time_window_start_brin', table, ['time_window_start'],
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        )
+        op.create_index('ix_branch_kpi_timeseries_branch_id_time_window', table, ['branch_id', 'time_window_start'])
+
+
+def _swap_table(table: str, new_table: str, primary_key: list) -> None:
+    """Copy table into new_table, move the id sequence over, and take over the original name."""
+    op.execute(f"INSERT INTO {new_table} SELECT * FROM {table}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {new_table}.id")
+    op.drop_table(table)
+    op.rename_table(new_table, table)
+
+    op.create_primary_key(f'pk_{table}', table, primary_key)
+    for name, referent, local_cols, remote_cols in FOREIGN_KEYS[table]:
+        op.create_foreign_key(name, table, referent, local_cols, remote_cols)
+    _create_indexes(table)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    now = datetime.utcnow()
+
+    for table, column in PARTITIONED_TABLES.items():
+        new_table = f'{table}_partitioned'
+        # LIKE ... INCLUDING DEFAULTS keeps the id default on the existing sequence, so ids carry over
+        op.execute(
+            f"CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+
+        # One partition per month from the oldest existing row through MONTHS_AHEAD
+        oldest = conn.execute(sa.text(f"SELECT min({column}) FROM {table}")).scalar()
+        first = month_start(min(oldest.replace(tzinfo=None), now) if oldest else now)
+        last = month_start(now, MONTHS_AHEAD)
+        month = first
+        while month <= last:
+            op.execute(month_partition_ddl(table, month, parent=new_table))
+            month = month_start(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT")
+
+        # The partition key has to be part of the primary key
+        _swap_table(table, new_table, ['id', column])
+
+
+def downgrade() -> None:
+    for table in PARTITIONED_TABLES:
+        new_table = f'{table}_unpartitioned'
+        op.execute(f"CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)")
+        # Dropping the parent in _swap_table drops every partition with it
+        _swap_table(table, new_table, ['id'])
@@ -35,7 +35,8 @@ class CustomerBranchMovement(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(UUID(as_uuid=True), ForeignKey("customers.customer_id"), nullable=False)
     branch_id = Column(String(100), ForeignKey("branches.id"), nullable=False)
-    enter_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    # Partition key, so part of the primary key
+    enter_time = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     exit_time = Column(TIMESTAMP(timezone=True), nullable=True)
     action_type = Column(Enum(ActionType), nullable=False)
     
@@ -45,9 +46,16 @@ class CustomerBranchMovement(Base):
     
     # Indexes for time-based queries
     __table_args__ = (
-        Index("ix_customer_branch_movement_enter_time", "enter_time"),
+        Index(
+            "ix_cbm_enter_time_brin", "enter_time",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
         Index("ix_customer_branch_movement_exit_time", "exit_time"),
-        Index("ix_customer_branch_movement_branch_id_enter_time", "branch_id", "enter_time"),
+        Index(
+            "ix_cbm_branch_enter_cov", "branch_id", "enter_time",
+            postgresql_include=["customer_id", "action_type", "exit_time"]
+        ),
+        {"postgresql_partition_by": "RANGE (enter_time)"},
     )
 
 
@@ -157,7 +165,8 @@ class BranchKPITimeseries(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     branch_id = Column(String(100), ForeignKey("branches.id"), nullable=False)
-    time_window_start = Column(TIMESTAMP(timezone=True), nullable=False)
+    # Partition key, so part of the primary key
+    time_window_start = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     time_window_end = Column(TIMESTAMP(timezone=True), nullable=False)
     
     # KPI Metrics
@@ -177,6 +186,10 @@ class BranchKPITimeseries(Base):
     # Indexes for time-based queries
     __table_args__ = (
         Index("ix_branch_kpi_timeseries_branch_id", "branch_id"),
-        Index("ix_branch_kpi_timeseries_time_window_start", "time_window_start"),
+        Index(
+            "ix_bkt_time_window_start_brin", "time_window_start",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
         Index("ix_branch_kpi_timeseries_branch_id_time_window", "branch_id", "time_window_start"),
+        {"postgresql_partition_by": "RANGE (time_window_start)"},
     )
@@ -0,0 +1,74 @@
+"""Monthly range partitions for the time-series tables."""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger()
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "customer_branch_movement": "enter_time",
+    "branch_kpi_timeseries": "time_window_start",
+}
+
+
+def month_start(value: datetime, offset: int = 0) -> datetime:
+    """First instant of the month containing value, shifted by offset months."""
+    month_index = value.year * 12 + value.month - 1 + offset
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_partition_ddl(table: str, month: datetime, parent: Optional[str] = None) -> str:
+    """
+    CREATE statement for the partition of table covering one month.
+
+    Args:
+        table: Base table name; partitions are named <table>_YYYY_MM
+        month: Any instant within the month
+        parent: Parent table to attach to, if different from table
+
+    Returns:
+        Idempotent CREATE TABLE ... PARTITION OF statement
+    """
+    start, end = month_start(month), month_start(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} "
+        f"PARTITION OF {parent or table} "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+
+
+async def ensure_month_partitions(
+    session: AsyncSession,
+    months_ahead: int = 1,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Create this month's and the next months_ahead months' partitions if missing.
+
+    Run ahead of time (e.g. daily from cron): once rows for a month land in
+    the DEFAULT partition, that month's partition can no longer be created.
+
+    Args:
+        session: Database session
+        months_ahead: Number of future months to pre-create
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        Statements executed
+    """
+    now = now or datetime.utcnow()
+    statements = [
+        month_partition_ddl(table, month_start(now, offset))
+        for table in PARTITIONED_TABLES
+        for offset in range(months_ahead + 1)
+    ]
+    for statement in statements:
+        await session.execute(text(statement))
+    await session.commit()
+
+    logger.info("Month partitions ensured", months_ahead=months_ahead, statements=len(statements))
+    return statements
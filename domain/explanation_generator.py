@@ -1,7 +1,15 @@
+from functools import lru_cache
 from typing import Dict, List, Optional
 from domain.situation_classifier import SituationResult, SituationType
 from domain.recommendation_engine import Recommendation
 
+
+@lru_cache(maxsize=64)
+def _pretty(name: str) -> str:
+    """Human-readable form of a snake_case label or KPI name (small fixed vocabulary)."""
+    return name.replace('_', ' ')
+
+
 class ExplanationGenerator:
     """
     Generates natural language explanations for situations and recommendations.
@@ -21,24 +29,30 @@ class ExplanationGenerator:
             recommendations = []
             
         # 1. Situation Description
-        explanation = f"{branch_name} is currently experiencing {situation.situation_label.value.replace('_', ' ')}."
+        parts = [
+            branch_name,
+            " is currently experiencing ",
+            _pretty(situation.situation_label.value),
+            ".",
+        ]
         
         # 2. Evidence
         if situation.evidence:
-            evidence_parts = []
-            for ev in situation.evidence:
-                # Format: "traffic dropped 18%" or "congestion is 95% (>80%)"
-                # Since we don't have historical context diff easily (unless in kpis), we state current values.
-                evidence_parts.append(f"{ev.kpi_name.replace('_', ' ')} is {ev.value:.2f} (threshold: {ev.threshold})")
-            
-            explanation += f" This is indicated by: {', '.join(evidence_parts)}."
+            # Format: "traffic dropped 18%" or "congestion is 95% (>80%)"
+            # Since we don't have historical context diff easily (unless in kpis), we state current values.
+            parts.append(" This is indicated by: ")
+            parts.append(", ".join(
+                f"{_pretty(ev.kpi_name)} is {ev.value:.2f} (threshold: {ev.threshold})"
+                for ev in situation.evidence
+            ))
+            parts.append(".")
         
         # 3. Recommendations
         if recommendations:
             top_rec = recommendations[0]
-            explanation += f" We recommend to {top_rec.action.lower()} which {top_rec.expected_impact.lower()}."
+            parts.append(f" We recommend to {top_rec.action.lower()} which {top_rec.expected_impact.lower()}.")
             
             if len(recommendations) > 1:
-                explanation += f" ({len(recommendations)-1} other actions available)"
+                parts.append(f" ({len(recommendations)-1} other actions available)")
                 
-        return explanation
+        return "".join(parts)
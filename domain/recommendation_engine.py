@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Optional
 from domain.situation_classifier import SituationResult
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Recommendation:
     """Actionable recommendation based on situation analysis."""
     action: str
@@ -1,10 +1,151 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence
+import numpy as np
 from domain.situation_classifier import SituationClassifier, SituationResult, SituationType, SituationEvidence
-from config.loader import business_rules
+from config.loader import business_rules, SituationThresholds
 import structlog
 
 logger = structlog.get_logger()
 
+
+def _f(value: Optional[float]) -> float:
+    """KPI value as float, with missing values read as 0.0."""
+    return float(value) if value is not None else 0.0
+
+
+# Column order of the KPI matrix taken by classify_batch
+BATCH_KPI_COLUMNS = (
+    "congestion_level",
+    "staffing_adequacy_index",
+    "bottleneck_score",
+    "traffic_index",
+    "conversion_proxy",
+)
+
+
+def kpi_matrix(kpis_list: Sequence[Dict[str, Optional[float]]]) -> np.ndarray:
+    """Stack per-branch KPI dicts into an (N, 5) matrix in BATCH_KPI_COLUMNS order, missing as 0.0."""
+    return np.array(
+        [[_f(kpis.get(name)) for name in BATCH_KPI_COLUMNS] for kpis in kpis_list],
+        dtype=np.float64
+    ).reshape(-1, len(BATCH_KPI_COLUMNS))
+
+
+# Each rule is a (predicate, builder) pair over the same arguments:
+# (thresholds, congestion, adequacy, bottleneck, traffic, conversion).
+# Predicates use only elementwise operators so they also evaluate on KPI columns.
+
+def _is_crowding(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion):
+    return congestion > t.crowding_congestion
+
+
+def _build_crowding(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion) -> SituationResult:
+    threshold = t.crowding_congestion
+    severity = 0.5
+    if congestion > t.crowding_high:
+        severity = 0.9
+    elif congestion > t.crowding_medium:
+        severity = 0.7
+        
+    return SituationResult(
+        situation_label=SituationType.CROWDING,
+        severity=severity,
+        evidence=(
+            SituationEvidence("congestion_level", congestion, threshold, 
+                            f"Congestion {congestion:.2f} exceeds threshold {threshold}"),
+        ),
+        details=f"Branch is experiencing high congestion ({congestion:.0%})."
+    )
+
+
+def _is_understaffed(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion):
+    # Condition: Low adequacy OR High bottleneck
+    # We check strictly if adequacy is calculated (not 0.0 implied missing) - wait, _f() reads missing as 0.0.
+    # Staffing adequacy 0.0 means bad IF we have valid data, but usually implies no staff data.
+    # Let's assume valid data for now.
+    return ((adequacy > 0) & (adequacy < t.understaffed_adequacy)) | (bottleneck > t.understaffed_bottleneck)
+
+
+def _build_understaffed(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion) -> SituationResult:
+    threshold_adequacy = t.understaffed_adequacy
+    threshold_bottleneck = t.understaffed_bottleneck
+    evidence = []
+    if 0 < adequacy < threshold_adequacy:
+         evidence.append(SituationEvidence("staffing_adequacy_index", adequacy, threshold_adequacy,
+                                         f"Staffing adequacy {adequacy:.2f} is below {threshold_adequacy}"))
+    if bottleneck > threshold_bottleneck:
+         evidence.append(SituationEvidence("bottleneck_score", bottleneck, threshold_bottleneck,
+                                         f"Bottleneck score {bottleneck:.2f} exceeds {threshold_bottleneck}"))
+    
+    return SituationResult(
+        situation_label=SituationType.UNDERSTAFFED,
+        severity=0.7,
+        evidence=tuple(evidence),
+        details="Branch appears understaffed relative to current traffic."
+    )
+
+
+def _is_high_traffic_low_conversion(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion):
+    return (traffic > t.htlc_traffic) & (conversion < t.htlc_conversion)
+
+
+def _build_high_traffic_low_conversion(
+    t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion
+) -> SituationResult:
+    limit_traffic = t.htlc_traffic
+    limit_conversion = t.htlc_conversion
+    return SituationResult(
+        situation_label=SituationType.HIGH_TRAFFIC_LOW_CONVERSION,
+        severity=0.6,
+        evidence=(
+            SituationEvidence("traffic_index", traffic, limit_traffic, 
+                            f"High traffic {traffic:.2f} > {limit_traffic}"),
+            SituationEvidence("conversion_proxy", conversion, limit_conversion, 
+                            f"Low conversion {conversion:.2f} < {limit_conversion}")
+        ),
+        details="High visitor traffic but low entered/passed ratio."
+    )
+
+
+def _is_underperformance(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion):
+    # Ensure traffic is not 0 to avoid false positives on empty data
+    return (traffic > 0) & (traffic < t.underperformance_traffic)
+
+
+def _build_underperformance(t: SituationThresholds, congestion, adequacy, bottleneck, traffic, conversion) -> SituationResult:
+    limit_traffic = t.underperformance_traffic
+    return SituationResult(
+        situation_label=SituationType.UNDERPERFORMANCE,
+        severity=0.5,
+        evidence=(
+            SituationEvidence("traffic_index", traffic, limit_traffic, 
+                            f"Traffic {traffic:.2f} is significantly below baseline"),
+        ),
+        details="Branch is underperforming in visitor traffic."
+    )
+
+
+def _build_normal() -> SituationResult:
+    return SituationResult(
+        situation_label=SituationType.NORMAL,
+        severity=0.0,
+        evidence=(),
+        details="All KPIs act within normal parameters."
+    )
+
+
+# Rules in priority order; the first that fires decides the situation
+_CHECKS = (
+    # 1. Crowding (High Priority - Safety/Experience)
+    (_is_crowding, _build_crowding),
+    # 2. Understaffing (High Priority - Service Level)
+    (_is_understaffed, _build_understaffed),
+    # 3. High Traffic Low Conversion (Medium Priority - Opportunity)
+    (_is_high_traffic_low_conversion, _build_high_traffic_low_conversion),
+    # 4. Underperformance (Low Priority - Strategic)
+    (_is_underperformance, _build_underperformance),
+)
+
+
 class RuleBasedSituationClassifier(SituationClassifier):
     """
     Classifies situations based on deterministic rules and configurable thresholds.
@@ -15,124 +156,57 @@ class RuleBasedSituationClassifier(SituationClassifier):
         Classifies the current situation based on KPI values.
         Prioritizes critical operational issues over strategic ones.
         """
-        thresholds = business_rules.situation_thresholds
-        
-        # 1. Check for Crowding (High Priority - Safety/Experience)
-        crowding_result = self._check_crowding(kpis, thresholds.get("crowding", {}))
-        if crowding_result:
-            return crowding_result
-            
-        # 2. Check for Understaffing (High Priority - Service Level)
-        understaffed_result = self._check_understaffed(kpis, thresholds.get("understaffed", {}))
-        if understaffed_result:
-            return understaffed_result
-
-        # 3. Check for High Traffic Low Conversion (Medium Priority - Opportunity)
-        high_traffic_result = self._check_high_traffic_low_conversion(kpis, thresholds.get("high_traffic_low_conversion", {}))
-        if high_traffic_result:
-            return high_traffic_result
-            
-        # 4. Check for Underperformance (Low Priority - Strategic)
-        underperformance_result = self._check_underperformance(kpis, thresholds.get("underperformance", {}))
-        if underperformance_result:
-            return underperformance_result
-            
-        # 5. Default to Normal
-        return SituationResult(
-            situation_label=SituationType.NORMAL,
-            severity=0.0,
-            evidence=[],
-            details="All KPIs act within normal parameters."
+        # Each KPI is read once; the checks only see scalars
+        get = kpis.get
+        return self._classify_values(
+            business_rules.compiled_thresholds,
+            _f(get("congestion_level")),
+            _f(get("staffing_adequacy_index")),
+            _f(get("bottleneck_score")),
+            _f(get("traffic_index")),
+            _f(get("conversion_proxy")),
         )
 
-    def _get_value(self, kpis: Dict, key: str) -> float:
-        val = kpis.get(key)
-        return float(val) if val is not None else 0.0
+    @staticmethod
+    def _classify_values(
+        thresholds: SituationThresholds,
+        congestion: float,
+        adequacy: float,
+        bottleneck: float,
+        traffic: float,
+        conversion: float
+    ) -> SituationResult:
+        """Rule evaluation for one KPI vector; the first rule that fires decides."""
+        values = (thresholds, congestion, adequacy, bottleneck, traffic, conversion)
+        for is_hit, build in _CHECKS:
+            if is_hit(*values):
+                return build(*values)
+        return _build_normal()
 
-    def _check_crowding(self, kpis: Dict, limits: Dict) -> Optional[SituationResult]:
-        congestion = self._get_value(kpis, "congestion_level")
-        threshold = limits.get("congestion_level", 0.8)
-        
-        if congestion > threshold:
-            severity = 0.5
-            if congestion > limits.get("severity_high", 0.9):
-                severity = 0.9
-            elif congestion > limits.get("severity_medium", 0.8):
-                severity = 0.7
-                
-            return SituationResult(
-                situation_label=SituationType.CROWDING,
-                severity=severity,
-                evidence=[
-                    SituationEvidence("congestion_level", congestion, threshold, 
-                                    f"Congestion {congestion:.2f} exceeds threshold {threshold}")
-                ],
-                details=f"Branch is experiencing high congestion ({congestion:.0%})."
-            )
-        return None
-
-    def _check_understaffed(self, kpis: Dict, limits: Dict) -> Optional[SituationResult]:
-        adequacy = self._get_value(kpis, "staffing_adequacy_index")
-        bottleneck = self._get_value(kpis, "bottleneck_score")
-        
-        threshold_adequacy = limits.get("staffing_adequacy_index", 0.7)
-        threshold_bottleneck = limits.get("bottleneck_score", 0.6)
-        
-        # Condition: Low adequacy OR High bottleneck
-        # We check strictly if adequacy is calculated (not 0.0 implied missing) - wait, _get_value returns 0.0 if missing.
-        # Staffing adequacy 0.0 means bad IF we have valid data, but usually implies no staff data.
-        # Let's assume valid data for now.
-        
-        if (0 < adequacy < threshold_adequacy) or (bottleneck > threshold_bottleneck):
-            severity = 0.7
-            evidence = []
-            if 0 < adequacy < threshold_adequacy:
-                 evidence.append(SituationEvidence("staffing_adequacy_index", adequacy, threshold_adequacy,
-                                                 f"Staffing adequacy {adequacy:.2f} is below {threshold_adequacy}"))
-            if bottleneck > threshold_bottleneck:
-                 evidence.append(SituationEvidence("bottleneck_score", bottleneck, threshold_bottleneck,
-                                                 f"Bottleneck score {bottleneck:.2f} exceeds {threshold_bottleneck}"))
-            
-            return SituationResult(
-                situation_label=SituationType.UNDERSTAFFED,
-                severity=severity,
-                evidence=evidence,
-                details="Branch appears understaffed relative to current traffic."
-            )
-        return None
-
-    def _check_high_traffic_low_conversion(self, kpis: Dict, limits: Dict) -> Optional[SituationResult]:
-        traffic = self._get_value(kpis, "traffic_index")
-        conversion = self._get_value(kpis, "conversion_proxy")
+    def classify_batch(self, kpis: np.ndarray) -> List[SituationResult]:
+        """
+        Classifies many branches at once.
+
+        Each rule's predicate runs once over whole KPI columns; rule priority
+        is resolved by masking out rows an earlier rule already claimed, and
+        result objects are only built per row for the rule that fired.
+
+        Args:
+            kpis: (N, 5) matrix in BATCH_KPI_COLUMNS order (see kpi_matrix())
+
+        Returns:
+            One SituationResult per row, identical to classify() on that row
+        """
+        t = business_rules.compiled_thresholds
+        kpis = np.nan_to_num(np.asarray(kpis, dtype=np.float64))
+        rows = kpis.tolist()
         
-        limit_traffic = limits.get("traffic_index", 1.2)
-        limit_conversion = limits.get("conversion_proxy", 0.6)
+        results: List[Optional[SituationResult]] = [None] * len(kpis)
+        undecided = np.ones(len(kpis), dtype=bool)
+        for is_hit, build in _CHECKS:
+            hit = undecided & is_hit(t, *kpis.T)
+            for i in np.flatnonzero(hit).tolist():
+                results[i] = build(t, *rows[i])
+            undecided &= ~hit
         
-        if traffic > limit_traffic and conversion < limit_conversion:
-             return SituationResult(
-                situation_label=SituationType.HIGH_TRAFFIC_LOW_CONVERSION,
-                severity=0.6,
-                evidence=[
-                    SituationEvidence("traffic_index", traffic, limit_traffic, 
-                                    f"High traffic {traffic:.2f} > {limit_traffic}"),
-                    SituationEvidence("conversion_proxy", conversion, limit_conversion, 
-                                    f"Low conversion {conversion:.2f} < {limit_conversion}")
-                ],
-                details="High visitor traffic but low entered/passed ratio."
-            )
-        return None
-
-    def _check_underperformance(self, kpis: Dict, limits: Dict) -> Optional[SituationResult]:
-        traffic = self._get_value(kpis, "traffic_index")
-        # Ensure traffic is not 0 to avoid false positives on empty data
-        if 0 < traffic < limits.get("traffic_index", 0.7):
-             return SituationResult(
-                situation_label=SituationType.UNDERPERFORMANCE,
-                severity=0.5,
-                evidence=[
-                    SituationEvidence("traffic_index", traffic, limits.get("traffic_index", 0.7), 
-                                    f"Traffic {traffic:.2f} is significantly below baseline")
-                ],
-                details="Branch is underperforming in visitor traffic."
-            )
-        return None
+        return [result or _build_normal() for result in results]
@@ -1,6 +1,7 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+import operator
 import structlog
-import re
 
 from domain.recommendation_engine import RecommendationEngine, Recommendation
 from domain.situation_classifier import SituationResult, SituationType
@@ -8,11 +9,87 @@ from config.loader import business_rules
 
 logger = structlog.get_logger()
 
+_OPERATORS = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+
+# Priority sort weights; rule priorities are lower-cased at config load
+_PRIO = {"high": 3, "medium": 2, "low": 1}
+
+
+def _never(kpis: Dict[str, float]) -> bool:
+    return False
+
+
+def _always(kpis: Dict[str, float]) -> bool:
+    return True
+
+
+def _parse_condition(condition: str) -> Optional[Tuple[str, str, float]]:
+    """
+    Split 'metric <op> number' into its parts in a single scan.
+
+    Returns:
+        (metric, operator, threshold), or None if the condition is malformed
+    """
+    for i, char in enumerate(condition):
+        if char in "<>=":
+            break
+    else:
+        return None
+
+    op_end = i + 2 if condition[i + 1:i + 2] == "=" else i + 1
+    op = condition[i:op_end]
+    if op not in _OPERATORS:
+        return None
+
+    metric = condition[:i].strip()
+    if not metric or not metric.replace("_", "").isalpha():
+        return None
+    try:
+        threshold = float(condition[op_end:])
+    except ValueError:
+        return None
+    return metric, op, threshold
+
+
+@lru_cache(maxsize=256)
+def compile_condition(condition: Optional[str]) -> Callable[[Dict[str, float]], bool]:
+    """
+    Parse a condition like 'congestion_level > 0.9' once into a KPI predicate.
+
+    Rule conditions come from a fixed config, so each distinct string is parsed
+    once per process and every later evaluation is a dict lookup and a compare.
+    """
+    if not condition:
+        return _always
+
+    parsed = _parse_condition(condition)
+    if parsed is None:
+        logger.warning(f"Invalid condition format: {condition}")
+        return _never
+
+    metric, op, threshold = parsed
+    compare = _OPERATORS[op]
+    return lambda kpis: compare(kpis.get(metric, 0.0), threshold)
+
+
 class RuleBasedRecommendationEngine(RecommendationEngine):
     """
     Generates recommendations based on configurable business rules.
     """
     
+    def __init__(self):
+        # Parse every configured condition up front (cached across engine instances)
+        for rules in business_rules.recommendation_rules.values():
+            for rule in rules:
+                compile_condition(rule.get("condition"))
+    
     def generate_recommendations(
         self, 
         situation_result: SituationResult,
@@ -42,39 +119,15 @@ class RuleBasedRecommendationEngine(RecommendationEngine):
                 rec = self._create_recommendation(rule, kpis)
                 recommendations.append(rec)
                 
-        return sorted(recommendations, key=lambda x: self._priority_value(x.priority), reverse=True)
+        return sorted(recommendations, key=lambda x: _PRIO.get(x.priority, 1), reverse=True)
 
     def _evaluate_condition(self, condition: str, kpis: Dict[str, float]) -> bool:
         """
         Evaluate a string condition like 'congestion_level > 0.9'.
         Supported operators: >, <, >=, <=, ==
         """
-        if not condition:
-            return True
-            
         try:
-            # Parse condition pattern: metric operator value
-            match = re.match(r"([a-zA-Z_]+)\s*(>|<|>=|<=|==)\s*([0-9.]+)", condition.strip())
-            if not match:
-                logger.warning(f"Invalid condition format: {condition}")
-                return False
-                
-            metric, operator, threshold_str = match.groups()
-            threshold = float(threshold_str)
-            value = kpis.get(metric, 0.0)
-            
-            if operator == ">":
-                return value > threshold
-            elif operator == "<":
-                return value < threshold
-            elif operator == ">=":
-                return value >= threshold
-            elif operator == "<=":
-                return value <= threshold
-            elif operator == "==":
-                return value == threshold
-                
-            return False
+            return compile_condition(condition)(kpis)
         except Exception as e:
             logger.error(f"Error evaluating condition '{condition}': {e}")
             return False
@@ -95,7 +148,3 @@ class RuleBasedRecommendationEngine(RecommendationEngine):
             value_factor=rule.get("value_factor", 0.0),
             details=None
         )
-
-    def _priority_value(self, priority: str) -> int:
-        mapping = {"high": 3, "medium": 2, "low": 1}
-        return mapping.get(priority.lower(), 1)
@@ -1,6 +1,6 @@
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional
 
 class SituationType(str, Enum):
     CROWDING = "crowding"
@@ -10,7 +10,7 @@ class SituationType(str, Enum):
     UNDERSTAFFED = "understaffed"
     NORMAL = "normal"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SituationEvidence:
     """Evidence supporting a situation classification."""
     kpi_name: str
@@ -18,12 +18,12 @@ class SituationEvidence:
     threshold: float
     description: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SituationResult:
     """Result of situation classification."""
     situation_label: SituationType
     severity: float  # 0.0 to 1.0
-    evidence: List[SituationEvidence]
+    evidence: Tuple[SituationEvidence, ...]
     details: str
 
 class SituationClassifier:
@@ -6,6 +6,8 @@ import structlog
 
 from db.session import AsyncSessionLocal
 from api_service.services.etl_service import ETLService
+from api_service.services.kpi_service import KPIService
+from pipelines.feature_engineering import FeatureEngineer
 
 logger = structlog.get_logger()
 
@@ -21,6 +23,9 @@ async def run_etl_pipeline(
         branch_id: Specific branch ID or None for all branches
         time_window_minutes: Time window size in minutes
     """
+    FeatureEngineer.warmup()
+    KPIService.warmup()
+
     async with AsyncSessionLocal() as db:
         etl_service = ETLService(db)
         result = await etl_service.run_etl(
@@ -1,42 +1,129 @@
 """Feature engineering module for advanced KPI computations."""
+from collections import Counter
 import numpy as np
-from typing import List, Dict, Any
-from scipy import stats
+from typing import Iterable, List, Dict, Any, Tuple
 import structlog
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; the NumPy kernel is used instead
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 logger = structlog.get_logger()
 
+# Reciprocal of the maximum acceptable people-per-staff checkout ratio (5:1)
+_INV_MAX_QUEUE_RATIO = 0.2
+
+
+def _encode_paths(movement_paths: Iterable[Tuple[Any, Any]]) -> np.ndarray:
+    """Pack each (from, to) path into one uint64 key: (from_id << 32) | to_id."""
+    location_ids: Dict[Any, int] = {}
+    intern = location_ids.setdefault
+    pairs = np.array(
+        [(intern(src, len(location_ids)), intern(dst, len(location_ids))) for src, dst in movement_paths],
+        dtype=np.uint64
+    ).reshape(-1, 2)
+    return (pairs[:, 0] << np.uint64(32)) | pairs[:, 1]
+
+
+@njit(cache=True)
+def _entropy_u64_jit(keys: np.ndarray) -> float:
+    # Equal keys are adjacent after sorting, so each run length is a path count
+    n = keys.shape[0]
+    ordered = np.sort(keys)
+    entropy = 0.0
+    run = 1
+    for i in range(1, n + 1):
+        if i < n and ordered[i] == ordered[i - 1]:
+            run += 1
+        else:
+            p = run / n
+            entropy -= p * np.log(p)
+            run = 1
+    return entropy
+
+
+def _flow_entropy_jit(movement_paths: Iterable[Tuple[Any, Any]]) -> float:
+    return _entropy_u64_jit(_encode_paths(movement_paths))
+
+
+def _flow_entropy_counter(movement_paths: Iterable[Tuple[Any, Any]]) -> float:
+    # Counter does the counting in C; no key packing needed without the JIT kernel
+    counts = Counter(movement_paths)
+    total = sum(counts.values())
+    if total == 0:
+        return 0.0
+    p = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) / total
+    return float(-(p * np.log(p)).sum())
+
+
+@njit(cache=True)
+def _min_max_mean_std_jit(values: np.ndarray):
+    # Single sweep; Welford's update keeps the variance stable without a second pass
+    if values.shape[0] == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    lo = hi = values[0]
+    mean = 0.0
+    m2 = 0.0
+    for i in range(values.shape[0]):
+        x = values[i]
+        if x < lo:
+            lo = x
+        elif x > hi:
+            hi = x
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+    return lo, hi, mean, np.sqrt(m2 / values.shape[0])
+
+
+def _min_max_mean_std_np(values: np.ndarray):
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    return values.min(), values.max(), values.mean(), values.std()
+
+
+@njit(cache=True, fastmath=True)
+def _r_squared(x: np.ndarray, y: np.ndarray) -> float:
+    # Squared Pearson correlation, which is R^2 of the least-squares line
+    dx = x - x.mean()
+    dy = y - y.mean()
+    den = np.sqrt((dx * dx).sum() * (dy * dy).sum())
+    if den == 0:
+        return 0.0
+    return ((dx * dy).sum() / den) ** 2
+
+
+if NUMBA_AVAILABLE:
+    _flow_entropy, _min_max_mean_std = _flow_entropy_jit, _min_max_mean_std_jit
+else:
+    _flow_entropy, _min_max_mean_std = _flow_entropy_counter, _min_max_mean_std_np
+
 
 class FeatureEngineer:
     """Advanced feature engineering for retail intelligence."""
     
     @staticmethod
-    def calculate_flow_entropy(movement_paths: List[tuple]) -> float:
+    def calculate_flow_entropy(movement_paths: Iterable[Tuple[Any, Any]]) -> float:
         """
         Calculate flow entropy from movement paths.
         Higher entropy = more diverse movement patterns.
         
         Args:
-            movement_paths: List of (from_location, to_location) tuples
+            movement_paths: (from_location, to_location) tuples; any iterable,
+                so callers can stream pairs without building a list
             
         Returns:
             Flow entropy value
         """
-        if not movement_paths:
-            return 0.0
-        
-        # Count path frequencies
-        path_counts = {}
-        for path in movement_paths:
-            path_counts[path] = path_counts.get(path, 0) + 1
-        
-        # Calculate probabilities
-        total = len(movement_paths)
-        probabilities = [count / total for count in path_counts.values()]
-        
-        # Calculate entropy
-        entropy = stats.entropy(probabilities)
-        return float(entropy)
+        # Shannon entropy (natural log) of the path frequency distribution
+        return float(_flow_entropy(movement_paths))
     
     @staticmethod
     def calculate_queue_pressure(
@@ -53,13 +140,33 @@ class FeatureEngineer:
         Returns:
             Queue pressure score (0-1)
         """
+        # No staff is maximum pressure; otherwise people per staff member,
+        # normalized to 0-1 (assuming 5:1 is maximum acceptable ratio)
         if staff_on_duty == 0:
-            return 1.0  # Maximum pressure
+            return 1.0
+        return min(people_near_checkout * _INV_MAX_QUEUE_RATIO / staff_on_duty, 1.0)
+
+    @staticmethod
+    def calculate_queue_pressure_batch(
+        people_near_checkout: np.ndarray,
+        staff_on_duty: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate queue pressure for many branches at once.
         
-        ratio = people_near_checkout / staff_on_duty
-        # Normalize to 0-1 scale (assuming 5:1 is maximum acceptable ratio)
-        pressure = min(ratio / 5.0, 1.0)
-        return pressure
+        Args:
+            people_near_checkout: Number of people in checkout area, one per branch
+            staff_on_duty: Number of staff members, one per branch
+            
+        Returns:
+            Queue pressure scores (0-1), matching calculate_queue_pressure elementwise
+        """
+        people = np.asarray(people_near_checkout, dtype=np.float64)
+        staff = np.asarray(staff_on_duty, dtype=np.float64)
+        # Unstaffed rows divide by zero here, but np.where replaces them with 1.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pressure = np.minimum(people * _INV_MAX_QUEUE_RATIO / staff, 1.0)
+        return np.where(staff == 0, 1.0, pressure)
     
     @staticmethod
     def calculate_peak_detection(
@@ -79,11 +186,10 @@ class FeatureEngineer:
         if not visitor_counts:
             return []
         
-        mean_count = np.mean(visitor_counts)
-        threshold = mean_count * threshold_multiplier
+        counts = np.asarray(visitor_counts)
+        threshold = counts.mean() * threshold_multiplier
         
-        peaks = [i for i, count in enumerate(visitor_counts) if count > threshold]
-        return peaks
+        return np.flatnonzero(counts > threshold).tolist()
     
     @staticmethod
     def calculate_trend_strength(
@@ -104,14 +210,21 @@ class FeatureEngineer:
             return 0.0
         
         try:
-            # Linear regression
-            slope, intercept, r_value, _, _ = stats.linregress(time_points, values)
-            r_squared = r_value ** 2
-            return float(r_squared)
+            return float(_r_squared(
+                np.asarray(time_points, dtype=np.float64),
+                np.asarray(values, dtype=np.float64)
+            ))
         except Exception as e:
             logger.error("Error calculating trend strength", error=str(e))
             return 0.0
     
+    @staticmethod
+    def warmup() -> None:
+        """Compile (or load cached) kernels so the first ETL window doesn't pay JIT cost."""
+        FeatureEngineer.calculate_flow_entropy([(0, 1), (0, 1), (1, 0)])
+        _min_max_mean_std(np.ones(2, dtype=np.float64))
+        FeatureEngineer.calculate_trend_strength([1.0, 2.0], [0.0, 1.0])
+
     @staticmethod
     def engineer_features(raw_data: Dict[str, Any]) -> Dict[str, float]:
         """
@@ -127,16 +240,18 @@ class FeatureEngineer:
         
         # Example feature engineering
         if "visitor_counts" in raw_data:
-            visitor_counts = raw_data["visitor_counts"]
-            features["visitor_mean"] = float(np.mean(visitor_counts))
-            features["visitor_std"] = float(np.std(visitor_counts))
-            features["visitor_max"] = float(np.max(visitor_counts))
-            features["visitor_min"] = float(np.min(visitor_counts))
+            visitor_counts = np.asarray(raw_data["visitor_counts"], dtype=np.float64)
+            lo, hi, mean, std = _min_max_mean_std(visitor_counts)
+            features["visitor_mean"] = float(mean)
+            features["visitor_std"] = float(std)
+            features["visitor_max"] = float(hi)
+            features["visitor_min"] = float(lo)
         
         if "dwell_times" in raw_data:
-            dwell_times = raw_data["dwell_times"]
-            features["dwell_time_mean"] = float(np.mean(dwell_times))
+            dwell_times = np.asarray(raw_data["dwell_times"], dtype=np.float64)
+            _, _, mean, std = _min_max_mean_std(dwell_times)
+            features["dwell_time_mean"] = float(mean)
             features["dwell_time_median"] = float(np.median(dwell_times))
-            features["dwell_time_std"] = float(np.std(dwell_times))
+            features["dwell_time_std"] = float(std)
         
         return features
@@ -0,0 +1,25 @@
+"""Partition maintenance job for time-partitioned tables."""
+import asyncio
+import structlog
+
+from db.session import AsyncSessionLocal
+from db.partitions import ensure_month_partitions
+
+logger = structlog.get_logger()
+
+
+async def run_partition_maintenance(months_ahead: int = 1):
+    """
+    Pre-create upcoming monthly partitions; schedule daily alongside the ETL.
+
+    Args:
+        months_ahead: Number of future months to pre-create
+    """
+    async with AsyncSessionLocal() as db:
+        statements = await ensure_month_partitions(db, months_ahead=months_ahead)
+        logger.info("Partition maintenance completed", statements=len(statements))
+        return statements
+
+
+if __name__ == "__main__":
+    asyncio.run(run_partition_maintenance())
@@ -1,5 +1,5 @@
 """Pydantic schemas for branches."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -15,8 +15,8 @@ class BranchCreate(BaseModel):
     expiry: Optional[datetime] = Field(None, description="Expiry date")
     restocking_schedule: Optional[str] = Field(None, description="Restocking schedule")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "branch_001",
                 "name": "Downtown Branch",
@@ -27,6 +27,7 @@ class BranchCreate(BaseModel):
                 "restocking_schedule": "Daily at 06:00"
             }
         }
+    )
 
 
 class BranchResponse(BaseModel):
@@ -40,5 +41,4 @@ class BranchResponse(BaseModel):
     expiry: Optional[datetime]
     restocking_schedule: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
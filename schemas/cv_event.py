@@ -1,5 +1,5 @@
 """Pydantic schemas for CV events."""
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, Field, UUID4, ConfigDict
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -22,8 +22,8 @@ class CVEventCreate(BaseModel):
     )
     action_type: ActionType = Field(..., description="Action type: passed / entered / exited")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "customer_id": "550e8400-e29b-41d4-a716-446655440000",
                 "branch_id": "branch_001",
@@ -32,6 +32,7 @@ class CVEventCreate(BaseModel):
                 "action_type": "entered"
             }
         }
+    )
 
 
 class CVEventResponse(BaseModel):
@@ -43,5 +44,4 @@ class CVEventResponse(BaseModel):
     exit_time: Optional[datetime]
     action_type: ActionType
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,5 @@
 """Pydantic schemas for events."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -14,8 +14,8 @@ class EventCreate(BaseModel):
     repetition: Optional[str] = Field(None, description="Repetition pattern: daily, weekly, monthly")
     global_event: bool = Field(False, description="Whether this is a global event")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "start_time": "2026-02-10T09:00:00Z",
                 "end_time": "2026-02-10T21:00:00Z",
@@ -26,6 +26,7 @@ class EventCreate(BaseModel):
                 "global_event": False
             }
         }
+    )
 
 
 class EventResponse(BaseModel):
@@ -39,5 +40,4 @@ class EventResponse(BaseModel):
     repetition: Optional[str]
     global_event: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
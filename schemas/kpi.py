@@ -1,5 +1,5 @@
 """Pydantic schemas for KPIs."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional
 
@@ -19,9 +19,9 @@ class KPIResponse(BaseModel):
     bottleneck_score: Optional[float] = Field(None, description="Queue pressure + flow entropy")
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "branch_id": "branch_001",
@@ -37,6 +37,7 @@ class KPIResponse(BaseModel):
                 "created_at": "2026-02-08T11:05:00Z"
             }
         }
+    )
 
 
 class ETLRunRequest(BaseModel):
@@ -1,5 +1,5 @@
 """Pydantic schemas for tasks."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -14,8 +14,8 @@ class TaskCreate(BaseModel):
     branch_id: str = Field(..., description="Branch ID")
     note: Optional[str] = Field(None, description="Additional notes")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "employee_id": 1,
                 "task": "Restock shelves in aisle 3",
@@ -25,6 +25,7 @@ class TaskCreate(BaseModel):
                 "note": "Priority: High"
             }
         }
+    )
 
 
 class TaskResponse(BaseModel):
@@ -37,8 +38,7 @@ class TaskResponse(BaseModel):
     branch_id: str
     note: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TaskFromRecommendation(BaseModel):
     """Schema for creating a task from a recommendation."""
@@ -1,11 +1,33 @@
 """Pytest configuration."""
 import pytest
+import pytest_asyncio
 import asyncio
+from httpx import ASGITransport, AsyncClient
+
+try:
+    import uvloop
+except ImportError:  # uvloop ships with uvicorn[standard] but not on every platform
+    uvloop = None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when it is installed, else the default asyncio loop."""
+    if uvloop is not None:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def app():
+    """The FastAPI app, built on first use rather than at collection time."""
+    # Imported here so tests that never touch the API don't need its settings
+    from api_service.main import app as _app
+    return _app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(app):
+    """One HTTP client on the in-process ASGI app, shared by every API test."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
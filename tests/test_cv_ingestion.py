@@ -1,69 +1,232 @@
 """Tests for CV ingestion endpoint."""
+import orjson
 import pytest
-from httpx import AsyncClient
-from datetime import datetime
-import uuid
 
-from api_service.main import app
+from db.models import Branch
 
+# Share the session-scoped client fixture's event loop
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-@pytest.mark.asyncio
-async def test_ingest_cv_event_valid():
+# Fixed payload values keep requests deterministic across runs
+FIXED_ENTER = "2024-01-01T12:00:00"
+FIXED_EXIT = "2024-01-01T12:05:00"
+STATIC_CID = "3f1c2a6e-8b4d-4e2a-9c7f-1d5e6b8a0c42"  # any fixed UUID v4
+
+# Bodies are pre-encoded with orjson, as the CV client sends them
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def test_ingest_cv_event_valid(client):
     """Test CV event ingestion with valid payload."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        event_data = {
-            "customer_id": str(uuid.uuid4()),
-            "branch_id": "test_branch_001",
-            "enter_time": datetime.utcnow().isoformat(),
-            "exit_time": datetime.utcnow().isoformat(),
-            "action_type": "entered"
-        }
-        
-        response = await client.post("/cv/events", json=event_data)
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "success"
-        assert "customer_id" in data
+    event_data = {
+        "customer_id": STATIC_CID,
+        "branch_id": "test_branch_001",
+        "enter_time": FIXED_ENTER,
+        "exit_time": FIXED_EXIT,
+        "action_type": "entered"
+    }
+    
+    response = await client.post("/cv/events", content=orjson.dumps(event_data), headers=JSON_HEADERS)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert "customer_id" in data
 
 
-@pytest.mark.asyncio
-async def test_ingest_cv_event_invalid_action_type():
+async def test_ingest_cv_event_invalid_action_type(client):
     """Test CV event ingestion with invalid action type."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        event_data = {
-            "customer_id": str(uuid.uuid4()),
+    event_data = {
+        "customer_id": STATIC_CID,
+        "branch_id": "test_branch_001",
+        "enter_time": FIXED_ENTER,
+        "exit_time": None,
+        "action_type": "invalid_action"  # Invalid
+    }
+    
+    response = await client.post("/cv/events", content=orjson.dumps(event_data), headers=JSON_HEADERS)
+    
+    assert response.status_code == 422  # Validation error
+
+
+async def test_ingest_cv_event_missing_fields(client):
+    """Test CV event ingestion with missing required fields."""
+    event_data = {
+        "customer_id": STATIC_CID,
+        # Missing branch_id, enter_time, action_type
+    }
+    
+    response = await client.post("/cv/events", content=orjson.dumps(event_data), headers=JSON_HEADERS)
+    
+    assert response.status_code == 422  # Validation error
+
+
+async def test_health_check(client):
+    """Test health check endpoint."""
+    response = await client.get("/health")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+
+
+async def test_ingest_cv_batch_invalid_event(client):
+    """Test batch ingestion rejects the whole batch on an invalid event."""
+    events = [
+        {
+            "customer_id": STATIC_CID,
             "branch_id": "test_branch_001",
-            "enter_time": datetime.utcnow().isoformat(),
+            "enter_time": FIXED_ENTER,
             "exit_time": None,
-            "action_type": "invalid_action"  # Invalid
+            "action_type": action_type
         }
-        
-        response = await client.post("/cv/events", json=event_data)
-        
-        assert response.status_code == 422  # Validation error
+        for action_type in ("entered", "invalid_action")
+    ]
+    
+    response = await client.post("/cv/events/batch", content=orjson.dumps(events), headers=JSON_HEADERS)
+    
+    assert response.status_code == 422  # Validation error
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "action_type"]
 
 
-@pytest.mark.asyncio
-async def test_ingest_cv_event_missing_fields():
-    """Test CV event ingestion with missing required fields."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        event_data = {
-            "customer_id": str(uuid.uuid4()),
-            # Missing branch_id, enter_time, action_type
+class FakeBatchSession:
+    """
+    AsyncSession stand-in for the batch endpoint.
+
+    Movement rows for bad_branch fail to insert; creating the placeholder
+    branch bad_upsert_branch fails on flush.
+    """
+
+    def __init__(self, bad_branch=None, bad_upsert_branch=None):
+        self.bad_branch = bad_branch
+        self.bad_upsert_branch = bad_upsert_branch
+        self.pending = []
+        self.created_branches = []
+        self.copied = []
+        self.inserted = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.pending.append(obj)
+
+    async def flush(self):
+        if any(getattr(obj, "id", None) == self.bad_upsert_branch for obj in self.pending):
+            raise ValueError("upsert failed")
+        self.created_branches.extend(obj.id for obj in self.pending if isinstance(obj, Branch))
+        self.pending.clear()
+
+    async def execute(self, statement):
+        if statement.is_insert:
+            values = statement.compile().params
+            if values["branch_id"] == self.bad_branch:
+                raise ValueError("insert failed")
+            self.inserted.append(values)
+            return None
+        # Customer/branch lookups: nothing exists yet
+        return FakeLookup()
+
+    async def copy(self, rows):
+        if any(row[1] == self.bad_branch for row in rows):
+            raise ValueError("copy failed")
+        self.copied.extend(rows)
+        return len(rows)
+
+    def begin_nested(self):
+        return FakeSavepoint(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class FakeLookup:
+    def scalars(self):
+        return []
+
+
+class FakeSavepoint:
+    """Savepoint that discards objects added inside it when rolled back."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.session.pending.clear()
+        return False
+
+
+@pytest.fixture
+def batch_session(app, monkeypatch):
+    """Route the batch endpoint's database session and COPY to a FakeBatchSession."""
+    from api_service.deps import get_database
+
+    session = FakeBatchSession(bad_branch="bad_branch", bad_upsert_branch="bad_upsert_branch")
+
+    async def override():
+        yield session
+
+    async def fake_copy(db, rows):
+        return await db.copy(rows)
+
+    monkeypatch.setattr("api_service.routers.cv_ingestion.bulk_insert_movements", fake_copy)
+    app.dependency_overrides[get_database] = override
+    yield session
+    app.dependency_overrides.pop(get_database)
+
+
+def _batch(branch_ids):
+    return [
+        {
+            "customer_id": STATIC_CID,
+            "branch_id": branch_id,
+            "enter_time": FIXED_ENTER,
+            "exit_time": FIXED_EXIT,
+            "action_type": "entered"
         }
-        
-        response = await client.post("/cv/events", json=event_data)
-        
-        assert response.status_code == 422  # Validation error
+        for branch_id in branch_ids
+    ]
 
 
-@pytest.mark.asyncio
-async def test_health_check():
-    """Test health check endpoint."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.get("/health")
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
+async def test_ingest_cv_batch_copies_all_events(client, batch_session):
+    """Test a clean batch is written with one COPY."""
+    events = _batch(["test_branch_001", "test_branch_002", "test_branch_001"])
+    
+    response = await client.post("/cv/events/batch", content=orjson.dumps(events), headers=JSON_HEADERS)
+    
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "processed": 3, "total": 3}
+    assert len(batch_session.copied) == 3
+    assert batch_session.inserted == []
+    assert batch_session.commits == 1
+
+
+async def test_ingest_cv_batch_isolates_failing_event(client, batch_session):
+    """Test a failed COPY falls back to per-event inserts that skip only the bad event."""
+    events = _batch(["test_branch_001", "bad_branch", "test_branch_002"])
+    
+    response = await client.post("/cv/events/batch", content=orjson.dumps(events), headers=JSON_HEADERS)
+    
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "processed": 2, "total": 3}
+    assert batch_session.copied == []
+    assert [row["branch_id"] for row in batch_session.inserted] == ["test_branch_001", "test_branch_002"]
+    assert batch_session.commits == 1
+
+
+async def test_ingest_cv_batch_isolates_failing_upsert(client, batch_session):
+    """Test a failed customer/branch upsert is retried per event and drops only the bad event."""
+    events = _batch(["test_branch_001", "bad_upsert_branch", "test_branch_002"])
+    
+    response = await client.post("/cv/events/batch", content=orjson.dumps(events), headers=JSON_HEADERS)
+    
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "processed": 2, "total": 3}
+    assert sorted(batch_session.created_branches) == ["test_branch_001", "test_branch_002"]
+    assert [row[1] for row in batch_session.copied] == ["test_branch_001", "test_branch_002"]
+    assert batch_session.commits == 1
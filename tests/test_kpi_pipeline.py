@@ -1,57 +1,23 @@
 """Tests for KPI pipeline and computation."""
+import numpy as np
 import pytest
-from api_service.services.kpi_service import KPIService
+from api_service.services.kpi_service import BRANCH_AGGREGATE_DTYPE, KPIService
 
 
-def test_traffic_index_computation():
-    """Test traffic index calculation."""
-    traffic_index = KPIService.compute_traffic_index(
-        current_visitors=150,
-        historical_baseline=100.0
-    )
-    
-    assert traffic_index == 1.5
-
-
-def test_conversion_proxy_computation():
-    """Test conversion proxy calculation."""
-    conversion_proxy = KPIService.compute_conversion_proxy(
-        entered_count=65,
-        passed_count=35
-    )
-    
-    assert conversion_proxy == 0.65
-
-
-def test_congestion_level_computation():
-    """Test congestion level calculation."""
-    congestion_level = KPIService.compute_congestion_level(
-        people_in_branch=45,
-        capacity=100
-    )
-    
-    assert congestion_level == 0.45
-
-
-def test_utilization_ratio_computation():
-    """Test utilization ratio calculation."""
-    utilization_ratio = KPIService.compute_utilization_ratio(
-        entered_count=48,
-        capacity=100
-    )
-    
-    assert utilization_ratio == 0.48
-
-
-def test_staffing_adequacy_computation():
-    """Test staffing adequacy index calculation."""
-    staffing_adequacy = KPIService.compute_staffing_adequacy_index(
-        staff_count=8,
-        visitor_count=100,
-        target_ratio=0.1
-    )
-    
-    assert staffing_adequacy == 0.8
+@pytest.mark.parametrize("compute,kwargs,expected", [
+    (KPIService.compute_traffic_index, {"current_visitors": 150, "historical_baseline": 100.0}, 1.5),
+    (KPIService.compute_conversion_proxy, {"entered_count": 65, "passed_count": 35}, 0.65),
+    (KPIService.compute_congestion_level, {"people_in_branch": 45, "capacity": 100}, 0.45),
+    (KPIService.compute_utilization_ratio, {"entered_count": 48, "capacity": 100}, 0.48),
+    (
+        KPIService.compute_staffing_adequacy_index,
+        {"staff_count": 8, "visitor_count": 100, "target_ratio": 0.1},
+        0.8
+    ),
+], ids=["traffic_index", "conversion_proxy", "congestion_level", "utilization_ratio", "staffing_adequacy"])
+def test_kpi_computation(compute, kwargs, expected):
+    """Test single-KPI calculations against hand-computed values."""
+    assert compute(**kwargs) == expected
 
 
 def test_bottleneck_score_computation():
@@ -86,3 +52,70 @@ def test_compute_all_kpis():
     assert kpis["utilization_ratio"] is not None
     assert kpis["staffing_adequacy_index"] is not None
     assert kpis["bottleneck_score"] is not None
+
+
+def test_compute_all_kpis_undefined_values():
+    """Test the fused computation reports undefined KPIs as None."""
+    kpis = KPIService.compute_all_kpis(
+        aggregated_data={"total_visitors": 0, "capacity": 0},
+        historical_baseline=0.0
+    )
+    
+    assert kpis == {
+        "traffic_index": None,
+        "conversion_proxy": None,
+        "congestion_level": None,
+        "growth_momentum": None,
+        "utilization_ratio": None,
+        "staffing_adequacy_index": None,
+        "bottleneck_score": None
+    }
+
+
+def test_compute_all_kpis_batch_matches_scalar():
+    """Test batched KPIs equal compute_all_kpis per branch, with NaN for None."""
+    rng = np.random.default_rng(0)
+    data = np.zeros(1024, dtype=BRANCH_AGGREGATE_DTYPE)
+    for name in BRANCH_AGGREGATE_DTYPE.names:
+        data[name] = rng.choice([0, 1, 3, 7, 50, 150, 1000], size=len(data))
+    baseline = rng.choice([0.0, 1.0, 37.5, 100.0], size=len(data))
+    
+    batch = KPIService.compute_all_kpis_batch(data, baseline)
+    
+    for i, row in enumerate(data):
+        kpis = KPIService.compute_all_kpis(
+            aggregated_data={name: row[name] for name in BRANCH_AGGREGATE_DTYPE.names},
+            historical_baseline=baseline[i]
+        )
+        for name, value in kpis.items():
+            assert batch[name][i] == pytest.approx(np.nan if value is None else value, nan_ok=True)
+
+
+@pytest.mark.parametrize("aggregated_data,historical_baseline", [
+    ({"total_visitors": 150, "passed_count": 50, "entered_count": 100, "capacity": 200, "staff_count": 10}, 100.0),
+    ({"total_visitors": 150, "passed_count": 50, "entered_count": 300, "capacity": 200, "staff_count": 0}, 100.0),
+    ({"total_visitors": 0, "passed_count": 0, "entered_count": 0, "capacity": 0, "staff_count": 3}, 0.0),
+    ({"total_visitors": 40, "passed_count": 0, "entered_count": 0, "capacity": 50, "staff_count": 20}, 12.5),
+], ids=["typical", "over_capacity_no_staff", "all_zero", "no_entries"])
+def test_compute_all_kpis_matches_single_kpis(aggregated_data, historical_baseline):
+    """Test each compute_* method agrees with the fused and batched paths, including undefined KPIs."""
+    visitors = aggregated_data["total_visitors"]
+    entered = aggregated_data["entered_count"]
+    congestion_level = KPIService.compute_congestion_level(entered, aggregated_data["capacity"])
+    staffing_adequacy = KPIService.compute_staffing_adequacy_index(aggregated_data["staff_count"], visitors)
+    expected = {
+        "traffic_index": KPIService.compute_traffic_index(visitors, historical_baseline),
+        "conversion_proxy": KPIService.compute_conversion_proxy(entered, aggregated_data["passed_count"]),
+        "congestion_level": congestion_level,
+        "growth_momentum": None,
+        "utilization_ratio": KPIService.compute_utilization_ratio(entered, aggregated_data["capacity"]),
+        "staffing_adequacy_index": staffing_adequacy,
+        "bottleneck_score": KPIService.compute_bottleneck_score(congestion_level, staffing_adequacy)
+    }
+    data = np.array([tuple(aggregated_data[name] for name in BRANCH_AGGREGATE_DTYPE.names)], dtype=BRANCH_AGGREGATE_DTYPE)
+    
+    batch = KPIService.compute_all_kpis_batch(data, historical_baseline)
+    
+    assert KPIService.compute_all_kpis(aggregated_data, historical_baseline) == expected
+    for name, value in expected.items():
+        assert batch[name][0] == pytest.approx(np.nan if value is None else value, nan_ok=True)
@@ -0,0 +1,20 @@
+"""Tests for monthly partition DDL helpers."""
+from datetime import datetime
+
+from db.partitions import month_partition_ddl, month_start
+
+
+def test_month_start_rolls_over_year():
+    assert month_start(datetime(2026, 12, 15, 8, 30)) == datetime(2026, 12, 1)
+    assert month_start(datetime(2026, 12, 15), 1) == datetime(2027, 1, 1)
+    assert month_start(datetime(2026, 1, 15), -1) == datetime(2025, 12, 1)
+
+
+def test_month_partition_ddl_bounds():
+    ddl = month_partition_ddl("customer_branch_movement", datetime(2026, 1, 20))
+
+    assert ddl == (
+        "CREATE TABLE IF NOT EXISTS customer_branch_movement_2026_01 "
+        "PARTITION OF customer_branch_movement "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')"
+    )
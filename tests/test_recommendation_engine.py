@@ -1,47 +1,34 @@
 import pytest
+from types import MappingProxyType
 from domain.situation_classifier import SituationResult, SituationType, SituationEvidence
 from domain.rule_based_recommendation import RuleBasedRecommendationEngine
 from domain.recommendation_engine import Recommendation
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def engine():
     return RuleBasedRecommendationEngine()
 
+# Shared read-only inputs; the proxies also check the engine never mutates its context
+CROWDING_SIT = SituationResult(SituationType.CROWDING, 0.9, (), "High crowding")
+CROWDING_CTX = MappingProxyType({"kpis": MappingProxyType({"congestion_level": 0.95})})
+
+UNDERPERFORMANCE_SIT = SituationResult(SituationType.UNDERPERFORMANCE, 0.5, (), "Underperformance")
+UNDERPERFORMANCE_CTX = MappingProxyType({"kpis": MappingProxyType({"traffic_index": 0.5, "conversion_proxy": 0.4})})
+
+NORMAL_SIT = SituationResult(SituationType.NORMAL, 0.0, (), "Normal")
+NORMAL_CTX = MappingProxyType({"kpis": MappingProxyType({})})
+
 def test_recommend_crowding(engine):
-    situation = SituationResult(
-        situation_label=SituationType.CROWDING,
-        severity=0.9,
-        evidence=[],
-        details="High crowding"
-    )
-    context = {"kpis": {"congestion_level": 0.95}}
-    
-    recs = engine.generate_recommendations(situation, context)
+    recs = engine.generate_recommendations(CROWDING_SIT, CROWDING_CTX)
     assert len(recs) > 0
     assert any(r.action == "Open additional checkout counters" for r in recs)
     
 def test_recommend_underperformance(engine):
-    situation = SituationResult(
-        situation_label=SituationType.UNDERPERFORMANCE,
-        severity=0.5,
-        evidence=[],
-        details="Underperformance"
-    )
-    context = {"kpis": {"traffic_index": 0.5, "conversion_proxy": 0.4}}
-    
-    recs = engine.generate_recommendations(situation, context)
+    recs = engine.generate_recommendations(UNDERPERFORMANCE_SIT, UNDERPERFORMANCE_CTX)
     assert len(recs) > 0
     
 def test_recommend_normal(engine):
-    situation = SituationResult(
-        situation_label=SituationType.NORMAL,
-        severity=0.0,
-        evidence=[],
-        details="Normal"
-    )
-    context = {"kpis": {}}
-    
-    recs = engine.generate_recommendations(situation, context)
+    recs = engine.generate_recommendations(NORMAL_SIT, NORMAL_CTX)
     assert len(recs) == 0
 
 def test_condition_evaluation(engine):
@@ -50,3 +37,11 @@ def test_condition_evaluation(engine):
     assert engine._evaluate_condition("congestion_level > 0.95", kpis) is False
     assert engine._evaluate_condition("congestion_level == 0.9", kpis) is True
     assert engine._evaluate_condition("congestion_level < 0.5", kpis) is False
+
+def test_condition_two_char_operators_and_malformed(engine):
+    kpis = {"congestion_level": 0.9}
+    assert engine._evaluate_condition("congestion_level >= 0.9", kpis) is True
+    assert engine._evaluate_condition("congestion_level <= 0.5", kpis) is False
+    assert engine._evaluate_condition("congestion_level ~ 0.5", kpis) is False
+    assert engine._evaluate_condition("congestion_level > high", kpis) is False
+    assert engine._evaluate_condition("> 0.5", kpis) is False
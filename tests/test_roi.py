@@ -0,0 +1,93 @@
+"""Tests for ROI geometry and batch kernels."""
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point
+
+from cv_service import roi_kernels
+from cv_service.roi import build_rois
+
+
+@pytest.fixture
+def rois():
+    return build_rois([
+        {"type": "polygon", "id": "zone", "points": [(100, 100), (400, 100), (400, 400), (100, 400)]},
+        {"type": "line", "id": "door", "points": [(0, 200), (500, 200)]},
+    ])
+
+
+def test_polygon_batch_matches_scalar(rois):
+    """Batch and scalar membership agree with Shapely."""
+    polygon = rois[0]
+    points = np.random.default_rng(0).uniform(0, 500, (500, 2))
+
+    batch = polygon.is_inside_batch(points)
+    scalar = [polygon.is_inside(tuple(p)) for p in points]
+    expected = [Point(p).within(polygon._polygon) for p in points]
+
+    assert batch.tolist() == expected
+    assert scalar == expected
+
+
+def test_line_batch_matches_scalar(rois):
+    """Batch and scalar crossing agree with Shapely."""
+    line = rois[1]
+    rng = np.random.default_rng(1)
+    prev_points = rng.uniform(0, 500, (500, 2))
+    curr_points = rng.uniform(0, 500, (500, 2))
+
+    batch = line.crossed_batch(prev_points, curr_points)
+    scalar = [line.crossed(tuple(p), tuple(c)) for p, c in zip(prev_points, curr_points)]
+    expected = [LineString([p, c]).crosses(line._line) for p, c in zip(prev_points, curr_points)]
+
+    assert batch.tolist() == expected
+    assert scalar == expected
+
+
+def test_zero_length_segment_never_crosses(rois):
+    line = rois[1]
+    points = np.array([[250.0, 200.0], [10.0, 10.0]])
+    assert not line.crossed_batch(points, points).any()
+
+
+def test_numpy_and_compiled_kernels_agree():
+    """The NumPy fallback matches the (optionally Numba-compiled) loop kernels."""
+    rng = np.random.default_rng(2)
+    points = rng.uniform(0, 500, (500, 2))
+    prev_points = rng.uniform(0, 500, (500, 2))
+    vertices = np.array([[100.0, 100.0], [400.0, 120.0], [380.0, 400.0], [150.0, 350.0], [250.0, 250.0]])
+    edges = roi_kernels.polygon_edges(vertices)
+    line = np.array([[0.0, 200.0], [500.0, 260.0]])
+
+    def out():
+        return np.empty(len(points), dtype=bool)
+
+    assert (
+        roi_kernels._poly_inside_np(points, edges, out())
+        == roi_kernels._poly_inside_jit(points, edges, out())
+    ).all()
+    assert (
+        roi_kernels._line_cross_np(prev_points, points, line, out())
+        == roi_kernels._line_cross_jit(prev_points, points, line, out())
+    ).all()
+
+
+def test_batch_writes_into_out_buffer(rois):
+    """Batch checks fill a caller-provided row of a reused hit matrix."""
+    points = np.array([[250.0, 250.0], [10.0, 10.0]])
+    hits = np.ones((2, 4), dtype=bool)[:, :2]
+
+    rois[0].is_inside_batch(points, out=hits[0])
+    rois[1].crossed_batch(points, points, out=hits[1])
+
+    assert hits.tolist() == [[True, False], [False, False]]
+
+
+def test_polygon_bbox_reject_matches_full_check():
+    """Points outside the bounding box are rejected without changing results."""
+    polygon = build_rois([{"type": "polygon", "points": [(100, 100), (200, 120), (150, 200)]}])[0]
+    points = np.random.default_rng(3).uniform(0, 500, (500, 2))
+
+    expected = roi_kernels.poly_inside_batch(points, polygon._edges)
+
+    assert polygon.is_inside_batch(points).tolist() == expected.tolist()
+    assert [polygon.is_inside(tuple(p)) for p in points] == expected.tolist()
@@ -1,65 +1,69 @@
 import pytest
 from domain.situation_classifier import SituationType
-from domain.rule_based_classifier import RuleBasedSituationClassifier
+import numpy as np
 
-@pytest.fixture
+from domain.rule_based_classifier import RuleBasedSituationClassifier, kpi_matrix
+
+@pytest.fixture(scope="module")
 def classifier():
     return RuleBasedSituationClassifier()
 
-def test_detect_crowding(classifier):
-    kpis = {
-        "congestion_level": 0.95,  # > 0.8
-        "traffic_index": 1.0,
-        "conversion_proxy": 0.5
-    }
-    result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.CROWDING
-    assert result.severity >= 0.9
-    assert len(result.evidence) > 0
+CASES = [
+    (
+        {"congestion_level": 0.95, "traffic_index": 1.0, "conversion_proxy": 0.5},  # congestion > 0.8
+        SituationType.CROWDING,
+        lambda r: r.severity >= 0.9 and len(r.evidence) > 0
+    ),
+    (
+        {"congestion_level": 0.5, "staffing_adequacy_index": 0.4, "bottleneck_score": 0.3},  # adequacy < 0.7
+        SituationType.UNDERSTAFFED,
+        lambda r: r.severity == 0.7
+    ),
+    (
+        {"congestion_level": 0.5, "staffing_adequacy_index": 0.8, "bottleneck_score": 0.8},  # bottleneck > 0.6
+        SituationType.UNDERSTAFFED,
+        None
+    ),
+    (
+        {"traffic_index": 1.5, "conversion_proxy": 0.4, "congestion_level": 0.5},  # traffic > 1.2, conversion < 0.6
+        SituationType.HIGH_TRAFFIC_LOW_CONVERSION,
+        None
+    ),
+    (
+        {"traffic_index": 0.5, "conversion_proxy": 0.8, "congestion_level": 0.2},  # traffic < 0.7
+        SituationType.UNDERPERFORMANCE,
+        None
+    ),
+    (
+        {"traffic_index": 1.0, "conversion_proxy": 0.8, "congestion_level": 0.5, "staffing_adequacy_index": 0.9},
+        SituationType.NORMAL,
+        None
+    ),
+]
 
-def test_detect_understaffed(classifier):
-    kpis = {
-        "congestion_level": 0.5,
-        "staffing_adequacy_index": 0.4,  # < 0.7
-        "bottleneck_score": 0.3
-    }
-    result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.UNDERSTAFFED
-    assert result.severity == 0.7
-    
-def test_detect_bottleneck(classifier):
-    kpis = {
-        "congestion_level": 0.5,
-        "staffing_adequacy_index": 0.8,
-        "bottleneck_score": 0.8  # > 0.6
-    }
-    result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.UNDERSTAFFED
-    
-def test_detect_high_traffic_low_conversion(classifier):
-    kpis = {
-        "traffic_index": 1.5,      # > 1.2
-        "conversion_proxy": 0.4,   # < 0.6
-        "congestion_level": 0.5
-    }
-    result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.HIGH_TRAFFIC_LOW_CONVERSION
-    
-def test_detect_underperformance(classifier):
-    kpis = {
-        "traffic_index": 0.5,      # < 0.7
-        "conversion_proxy": 0.8,
-        "congestion_level": 0.2
-    }
+@pytest.mark.parametrize(
+    "kpis,label,check",
+    CASES,
+    ids=["crowding", "understaffed", "bottleneck", "high_traffic_low_conversion", "underperformance", "normal"]
+)
+def test_classify(classifier, kpis, label, check):
     result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.UNDERPERFORMANCE
-    
-def test_detect_normal(classifier):
-    kpis = {
-        "traffic_index": 1.0,
-        "conversion_proxy": 0.8,
-        "congestion_level": 0.5,
-        "staffing_adequacy_index": 0.9
-    }
-    result = classifier.classify(kpis)
-    assert result.situation_label == SituationType.NORMAL
+    assert result.situation_label == label
+    assert check is None or check(result)
+
+def test_classify_batch_matches_classify(classifier):
+    rng = np.random.default_rng(3)
+    kpis_list = [
+        dict(zip(
+            ("congestion_level", "staffing_adequacy_index", "bottleneck_score", "traffic_index", "conversion_proxy"),
+            row
+        ))
+        for row in rng.uniform(0, 1.5, size=(200, 5)).tolist()
+    ]
+    kpis_list.append({})
+
+    batch = classifier.classify_batch(kpi_matrix(kpis_list))
+
+    assert batch == [classifier.classify(kpis) for kpis in kpis_list]
+    assert len({result.situation_label for result in batch}) == len(SituationType) - 1
+
@@ -1,13 +1,45 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 from api_service.services.task_service import TaskService
 from schemas.task import TaskFromRecommendation, TaskStatusUpdate, TaskAction
 from db.models import Task
 
+
+class FakeResult:
+    """Query result holding at most one row."""
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def scalar_one_or_none(self):
+        return self._obj
+
+
+class FakeSession:
+    """Minimal AsyncSession stand-in that records calls instead of hitting a database."""
+
+    def __init__(self, obj=None):
+        self.added = []
+        self.commits = 0
+        self.refreshes = 0
+        self._obj = obj
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        self.refreshes += 1
+
+    async def execute(self, statement):
+        return FakeResult(self._obj)
+
+
 @pytest.mark.asyncio
 async def test_create_from_recommendation():
-    mock_db = AsyncMock()
-    service = TaskService(mock_db)
+    db = FakeSession()
+    service = TaskService(db)
     
     req = TaskFromRecommendation(
         employee_id=1,
@@ -25,20 +57,15 @@ async def test_create_from_recommendation():
     assert "High impact" in task.task
     assert task.state == "pending"
     
-    mock_db.add.assert_called_once()
-    mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once()
+    assert db.added == [task]
+    assert db.commits == 1
+    assert db.refreshes == 1
 
 @pytest.mark.asyncio
 async def test_approve_task():
-    mock_db = AsyncMock()
-    service = TaskService(mock_db)
-    
-    # Mock existing task
-    mock_task = Task(id=1, state="pending", note="original")
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = mock_task
-    mock_db.execute.return_value = mock_result
+    # Existing task returned by the lookup
+    db = FakeSession(Task(id=1, state="pending", note="original"))
+    service = TaskService(db)
     
     update = TaskStatusUpdate(action=TaskAction.APPROVE, note="Approved by Manager")
     updated_task = await service.update_status(1, update)
@@ -46,17 +73,12 @@ async def test_approve_task():
     assert updated_task.state == "in_progress"
     assert "IN_PROGRESS" in updated_task.note
     
-    mock_db.commit.assert_called_once()
+    assert db.commits == 1
 
 @pytest.mark.asyncio
 async def test_complete_task():
-    mock_db = AsyncMock()
-    service = TaskService(mock_db)
-    
-    mock_task = Task(id=1, state="in_progress")
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = mock_task
-    mock_db.execute.return_value = mock_result
+    db = FakeSession(Task(id=1, state="in_progress"))
+    service = TaskService(db)
     
     update = TaskStatusUpdate(action=TaskAction.COMPLETE)
     updated_task = await service.update_status(1, update)
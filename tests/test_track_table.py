@@ -0,0 +1,49 @@
+"""Tests for the structure-of-arrays track table."""
+import numpy as np
+
+from cv_service.track_table import TrackTable
+
+
+def test_get_or_create_grows_past_capacity():
+    table = TrackTable(capacity=2)
+    rows = [table.get_or_create(track_id) for track_id in (7, 8, 9, 7)]
+
+    assert rows == [0, 1, 2, 0]
+    assert len(table) == 3
+    assert len(table.track_id) == 4
+
+
+def test_previous_centers_fall_back_for_new_tracks():
+    table = TrackTable()
+    idx = np.array([table.get_or_create(1)])
+    table.update(idx[0], 10, 20, 0.5, t_ns=0)
+    idx = np.array([table.get_or_create(1), table.get_or_create(2)])
+
+    prev = table.previous_centers(idx, np.array([[11, 21], [30, 40]], dtype=np.int32))
+
+    assert prev.tolist() == [[10, 20], [30, 40]]
+
+
+def test_vacuum_compacts_rows_and_keeps_state():
+    table = TrackTable()
+    for track_id, t_ns in ((1, 0), (2, 5), (3, 0)):
+        table.update(table.get_or_create(track_id), track_id, track_id, 0.8, t_ns)
+    customer_id = table.customer_ids[1]
+
+    removed = table.vacuum(now_ns=10, ttl_ns=7)
+
+    assert removed == [1, 3]
+    assert table.id_to_idx == {2: 0}
+    assert table.customer_ids == [customer_id]
+    assert table.last_center_xy[0].tolist() == [2, 2]
+    assert table.confidence_avg(0) == np.float32(0.8)
+
+
+def test_get_or_create_many_matches_single_lookups():
+    table = TrackTable(capacity=2)
+    table.get_or_create(5)
+
+    rows = table.get_or_create_many([5, 6, 7])
+
+    assert rows.tolist() == [0, 1, 2]
+    assert rows.tolist() == [table.get_or_create(t) for t in (5, 6, 7)]
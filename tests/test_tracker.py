@@ -0,0 +1,133 @@
+"""Tests for the IoU-matching ByteTracker."""
+import uuid
+
+import numpy as np
+import pytest
+
+from cv_service import tracker_kernels
+from cv_service.tracker import HISTORY_LENGTH, ByteTracker, Track
+
+
+@pytest.fixture
+def tracker():
+    return ByteTracker(max_age=30)
+
+
+def test_iou_matrix_values():
+    det = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=np.float32)
+    trk = np.array([[5, 0, 15, 10], [0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+
+    iou = ByteTracker._iou_matrix(det, trk)
+
+    assert iou.shape == (2, 3)
+    np.testing.assert_allclose(iou[0], [50 / 150, 1.0, 0.0])
+    np.testing.assert_allclose(iou[1], [0.0, 0.0, 0.0])
+
+
+def test_iou_matrix_x_overlap_without_y_overlap():
+    det = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    trk = np.array([[0, 50, 10, 60], [0, 5, 10, 15]], dtype=np.float32)
+
+    iou = ByteTracker._iou_matrix(det, trk)
+
+    np.testing.assert_allclose(iou[0], [0.0, 50 / 150])
+
+
+def test_numpy_and_compiled_iou_kernels_agree():
+    """The NumPy fallback matches the (optionally Numba-compiled) streaming kernel."""
+    rng = np.random.default_rng(1)
+    xy = rng.uniform(0, 200, size=(60, 2)).astype(np.float32)
+    boxes = np.hstack([xy, xy + rng.uniform(10, 80, size=(60, 2)).astype(np.float32)])
+    det, trk = boxes[:25], boxes[25:]
+    det_areas, trk_areas = tracker_kernels.box_areas(det), tracker_kernels.box_areas(trk)
+
+    def out():
+        return np.full((len(det), len(trk)), -1.0, dtype=np.float32)
+
+    expected = tracker_kernels._iou_gated_np(det, trk, det_areas, trk_areas, 0.3, out())
+    np.testing.assert_allclose(
+        tracker_kernels._iou_gated_jit(det, trk, det_areas, trk_areas, 0.3, out()), expected, rtol=1e-5
+    )
+    assert expected.max() > 0.3
+    assert not ((expected > 0) & (expected <= 0.3)).any()
+
+
+def test_greedy_assign_takes_highest_iou_first():
+    iou = np.array([[0.9, 0.5], [0.8, 0.0], [0.0, 0.4]], dtype=np.float32)
+    match_of = np.full(3, -1, dtype=np.intp)
+
+    ByteTracker._greedy_assign(iou, match_of)
+
+    assert match_of.tolist() == [0, -1, 1]
+
+
+def test_overlapping_detection_continues_track(tracker):
+    tracker.update([(0, 0, 100, 200, 0.9)])
+    tracks = tracker.update([(5, 5, 105, 205, 0.9)])
+
+    assert list(tracks) == [1]
+    assert tracks[1].bbox == (5, 5, 105, 205)
+
+
+def test_distant_detection_starts_new_track(tracker):
+    tracker.update([(0, 0, 100, 200, 0.9)])
+    tracks = tracker.update([(0, 0, 100, 200, 0.9), (400, 0, 500, 200, 0.8)])
+
+    assert sorted(tracks) == [1, 2]
+    assert tracks[1].customer_id != tracks[2].customer_id
+
+
+def test_each_track_matched_at_most_once(tracker):
+    tracker.update([(0, 0, 100, 200, 0.9)])
+    tracks = tracker.update([(0, 0, 100, 200, 0.9), (10, 0, 110, 200, 0.9)])
+
+    # Best overlap keeps the track; the other detection starts a new one
+    assert sorted(tracks) == [1, 2]
+    assert tracks[1].bbox == (0, 0, 100, 200)
+    assert tracks[2].bbox == (10, 0, 110, 200)
+
+
+def test_slots_grow_past_capacity():
+    tracker = ByteTracker(capacity=2)
+    tracks = tracker.update([(100 * i, 0, 100 * i + 50, 50, 0.9) for i in range(5)])
+
+    assert len(tracks) == 5
+    assert len(tracker._bboxes) == 8
+    assert tracker._active_mask.sum() == 5
+
+
+def test_unseen_tracks_age_out(tracker, monkeypatch):
+    clock = iter([100.0, 115.0, 140.0])
+    monkeypatch.setattr("cv_service.tracker.time.monotonic", lambda: next(clock))
+
+    tracker.update([(0, 0, 100, 200, 0.9)])
+    assert list(tracker.update([])) == [1]
+    assert tracker.update([]) == {}
+    assert not tracker._active_mask.any()
+
+
+def test_new_tracks_get_distinct_v4_customer_ids(tracker):
+    tracks = tracker.update([(100 * i, 0, 100 * i + 50, 50, 0.9) for i in range(4)])
+    customer_ids = [track.customer_id for track in tracks.values()]
+
+    assert len(set(customer_ids)) == 4
+    assert all(c.version == 4 and c.variant == uuid.RFC_4122 for c in customer_ids)
+
+
+def test_history_keeps_last_points_in_order():
+    track = Track(1, (0, 0, 10, 10), now_ts=0.0)
+    for i in range(HISTORY_LENGTH + 5):
+        track.update((i, i, i + 10, i + 10), now_ts=float(i))
+
+    history = track.get_history()
+
+    assert history.shape == (HISTORY_LENGTH, 2)
+    assert history[0].tolist() == [5 + 5, 5 + 5]
+    assert history[-1].tolist() == [HISTORY_LENGTH + 4 + 5, HISTORY_LENGTH + 4 + 5]
+
+
+def test_matched_track_history_gets_detection_center(tracker):
+    tracker.update([(0, 0, 100, 200, 0.9)])
+    tracks = tracker.update([(5, 5, 106, 206, 0.9)])
+
+    assert tracks[1].get_history().tolist() == [[55, 105]]